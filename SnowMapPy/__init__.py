@@ -71,6 +71,7 @@ from .core import (
     
     # Temporal interpolation
     interpolate_temporal,
+    interpolate_temporal_day,
     get_interpolation_methods,
     validate_interpolation_method,
     
@@ -80,6 +81,7 @@ from .core import (
     get_invalid_modis_classes,
     create_modis_class_mask,
     apply_modis_quality_mask,
+    apply_modis_quality_mask_pair,
     
     # Utilities
     extract_date,
@@ -94,10 +96,12 @@ from .core import (
     
     # Optimal chunking utilities
     calculate_optimal_chunks,
+    compute_balanced_chunks,
     estimate_memory_for_processing,
     
     # Console utilities
     suppress_warnings,
+    set_verbose,
     print_banner,
     print_section,
     print_config,
@@ -157,6 +161,7 @@ __all__ = [
     
     # Core - Temporal
     'interpolate_temporal',
+    'interpolate_temporal_day',
     'get_interpolation_methods',
     'validate_interpolation_method',
     
@@ -166,6 +171,7 @@ __all__ = [
     'get_invalid_modis_classes',
     'create_modis_class_mask',
     'apply_modis_quality_mask',
+    'apply_modis_quality_mask_pair',
     
     # Core - Utils
     'extract_date',
@@ -180,10 +186,12 @@ __all__ = [
     
     # Core - Optimal chunking
     'calculate_optimal_chunks',
+    'compute_balanced_chunks',
     'estimate_memory_for_processing',
     
     # Core - Console utilities
     'suppress_warnings',
+    'set_verbose',
     'print_banner',
     'print_section',
     'print_config',
@@ -34,6 +34,21 @@ from numba import njit, prange
 INVALID_CLASSES = np.array([200, 201, 211, 237, 239, 250, 254], dtype=np.float64)
 
 
+def build_invalid_class_lut(invalid_classes):
+    """
+    Build a 256-entry boolean lookup table flagging invalid class codes.
+    
+    MODIS class codes fit in 8 bits, so membership becomes a single
+    table load instead of a comparison against every invalid code.
+    """
+    lut = np.zeros(256, dtype=np.bool_)
+    lut[np.asarray(invalid_classes, dtype=np.int64)] = True
+    return lut
+
+
+INVALID_CLASS_LUT = build_invalid_class_lut(INVALID_CLASSES)
+
+
 @njit(cache=True)
 def is_invalid_class(value):
     """
@@ -61,6 +76,9 @@ def interpolate_nearest_3d(data, nanmask):
     This prioritizes past observations over future ones, matching the original
     SnowMapPy gap-filling behavior.
     
+    Each pixel is walked once: gaps take the last valid value seen, and the
+    gaps before the first valid observation take that first value.
+    
     Args:
         data: 3D array (lat, lon, time) with NaN gaps
         nanmask: 2D boolean mask for permanently invalid pixels
@@ -76,25 +94,20 @@ def interpolate_nearest_3d(data, nanmask):
             if nanmask[i, j]:
                 continue
             
+            first_valid = -1
             for t in range(times):
-                if np.isnan(result[i, j, t]):
-                    fill_val = np.nan
-                    
-                    # FIRST: Search backward in time (past days have priority)
-                    for offset in range(1, times):
-                        t_back = t - offset
-                        if t_back >= 0 and not np.isnan(data[i, j, t_back]):
-                            fill_val = data[i, j, t_back]
-                            break
-                    
-                    # ONLY if no past value found, search forward in time
-                    if np.isnan(fill_val):
-                        for offset in range(1, times):
-                            t_fwd = t + offset
-                            if t_fwd < times and not np.isnan(data[i, j, t_fwd]):
-                                fill_val = data[i, j, t_fwd]
-                                break
-                    
+                if not np.isnan(data[i, j, t]):
+                    if first_valid < 0:
+                        first_valid = t
+                    last_val = data[i, j, t]
+                elif first_valid >= 0:
+                    # Nearest past observation
+                    result[i, j, t] = last_val
+            
+            # Leading gap: no past observation, use the nearest future one
+            if first_valid > 0:
+                fill_val = data[i, j, first_valid]
+                for t in range(first_valid):
                     result[i, j, t] = fill_val
     
     return result
@@ -109,6 +122,9 @@ def interpolate_linear_3d(data, nanmask):
     and linearly interpolates between them. Edges are filled with the
     nearest valid value.
     
+    Each pixel is walked once, carrying the previous valid observation,
+    and each gap is filled when the observation closing it is reached.
+    
     Args:
         data: 3D array (lat, lon, time) with NaN gaps
         nanmask: 2D boolean mask for permanently invalid pixels
@@ -124,41 +140,26 @@ def interpolate_linear_3d(data, nanmask):
             if nanmask[i, j]:
                 continue
             
-            # Collect indices of valid observations
-            valid_indices = []
-            for t in range(times):
-                if not np.isnan(result[i, j, t]):
-                    valid_indices.append(t)
-            
-            if len(valid_indices) == 0:
-                continue
-            elif len(valid_indices) == 1:
-                # Only one observation - use it everywhere
-                val = result[i, j, valid_indices[0]]
-                for t in range(times):
-                    result[i, j, t] = val
-                continue
-            
-            # Interpolate between consecutive valid points
-            for k in range(len(valid_indices) - 1):
-                t1 = valid_indices[k]
-                t2 = valid_indices[k + 1]
-                v1 = result[i, j, t1]
-                v2 = result[i, j, t2]
-                
-                for t in range(t1 + 1, t2):
-                    alpha = (t - t1) / (t2 - t1)
-                    result[i, j, t] = v1 + alpha * (v2 - v1)
-            
-            # Extend edges with nearest value
-            first_valid = valid_indices[0]
-            last_valid = valid_indices[-1]
-            
-            for t in range(0, first_valid):
-                result[i, j, t] = result[i, j, first_valid]
+            t1 = -1
+            for t2 in range(times):
+                if np.isnan(data[i, j, t2]):
+                    continue
+                v2 = data[i, j, t2]
+                if t1 < 0:
+                    # Extend leading edge with the first valid value
+                    for t in range(t2):
+                        result[i, j, t] = v2
+                else:
+                    v1 = data[i, j, t1]
+                    for t in range(t1 + 1, t2):
+                        alpha = (t - t1) / (t2 - t1)
+                        result[i, j, t] = v1 + alpha * (v2 - v1)
+                t1 = t2
             
-            for t in range(last_valid + 1, times):
-                result[i, j, t] = result[i, j, last_valid]
+            # Extend trailing edge with the last valid value
+            if t1 >= 0:
+                for t in range(t1 + 1, times):
+                    result[i, j, t] = data[i, j, t1]
     
     return result
 
@@ -183,23 +184,23 @@ def interpolate_cubic_3d(data, nanmask):
     result = data.copy()
     
     for i in prange(rows):
+        # Indices of valid observations, reused for every pixel in the row
+        valid_indices = np.empty(times, dtype=np.int64)
+        
         for j in range(cols):
             if nanmask[i, j]:
                 continue
             
-            valid_indices = []
-            valid_values = []
+            n_valid = 0
             for t in range(times):
-                if not np.isnan(result[i, j, t]):
-                    valid_indices.append(t)
-                    valid_values.append(result[i, j, t])
-            
-            n_valid = len(valid_indices)
+                if not np.isnan(data[i, j, t]):
+                    valid_indices[n_valid] = t
+                    n_valid += 1
             
             if n_valid == 0:
                 continue
             elif n_valid == 1:
-                val = valid_values[0]
+                val = data[i, j, valid_indices[0]]
                 for t in range(times):
                     result[i, j, t] = val
                 continue
@@ -208,8 +209,8 @@ def interpolate_cubic_3d(data, nanmask):
                 for k in range(n_valid - 1):
                     t1 = valid_indices[k]
                     t2 = valid_indices[k + 1]
-                    v1 = valid_values[k]
-                    v2 = valid_values[k + 1]
+                    v1 = data[i, j, t1]
+                    v2 = data[i, j, t2]
                     
                     for t in range(t1 + 1, t2):
                         alpha = (t - t1) / (t2 - t1)
@@ -221,15 +222,10 @@ def interpolate_cubic_3d(data, nanmask):
                     t2 = valid_indices[k + 1]
                     
                     # Four control points for the spline
-                    p0_idx = max(0, k - 1)
-                    p1_idx = k
-                    p2_idx = k + 1
-                    p3_idx = min(n_valid - 1, k + 2)
-                    
-                    p0 = valid_values[p0_idx]
-                    p1 = valid_values[p1_idx]
-                    p2 = valid_values[p2_idx]
-                    p3 = valid_values[p3_idx]
+                    p0 = data[i, j, valid_indices[max(0, k - 1)]]
+                    p1 = data[i, j, t1]
+                    p2 = data[i, j, t2]
+                    p3 = data[i, j, valid_indices[min(n_valid - 1, k + 2)]]
                     
                     for t in range(t1 + 1, t2):
                         u = (t - t1) / (t2 - t1)
@@ -246,7 +242,7 @@ def interpolate_cubic_3d(data, nanmask):
             
             # Extend edges
             first_valid = valid_indices[0]
-            last_valid = valid_indices[-1]
+            last_valid = valid_indices[n_valid - 1]
             
             for t in range(0, first_valid):
                 result[i, j, t] = result[i, j, first_valid]
@@ -257,6 +253,143 @@ def interpolate_cubic_3d(data, nanmask):
     return result
 
 
+@njit(parallel=True, cache=True)
+def interpolate_nearest_day(data, nanmask, day):
+    """
+    Fill the gaps of a single day in place, as interpolate_nearest_3d would.
+    
+    Only data[:, :, day] is written, so a caller that needs one day of
+    the window does not pay for filling (and copying) the others.
+    
+    Args:
+        data: 3D array (lat, lon, time) with NaN gaps, modified in place
+        nanmask: 2D boolean mask for permanently invalid pixels
+        day: Index of the day to fill
+    """
+    rows, cols, times = data.shape
+    
+    for i in prange(rows):
+        for j in range(cols):
+            if nanmask[i, j] or not np.isnan(data[i, j, day]):
+                continue
+            
+            # Nearest past observation first, then nearest future one
+            for t in range(day - 1, -1, -1):
+                if not np.isnan(data[i, j, t]):
+                    data[i, j, day] = data[i, j, t]
+                    break
+            if np.isnan(data[i, j, day]):
+                for t in range(day + 1, times):
+                    if not np.isnan(data[i, j, t]):
+                        data[i, j, day] = data[i, j, t]
+                        break
+
+
+@njit(parallel=True, cache=True)
+def interpolate_linear_day(data, nanmask, day):
+    """
+    Fill the gaps of a single day in place, as interpolate_linear_3d would.
+    
+    Args:
+        data: 3D array (lat, lon, time) with NaN gaps, modified in place
+        nanmask: 2D boolean mask for permanently invalid pixels
+        day: Index of the day to fill
+    """
+    rows, cols, times = data.shape
+    
+    for i in prange(rows):
+        for j in range(cols):
+            if nanmask[i, j] or not np.isnan(data[i, j, day]):
+                continue
+            
+            t1 = -1
+            for t in range(day - 1, -1, -1):
+                if not np.isnan(data[i, j, t]):
+                    t1 = t
+                    break
+            t2 = -1
+            for t in range(day + 1, times):
+                if not np.isnan(data[i, j, t]):
+                    t2 = t
+                    break
+            
+            if t1 >= 0 and t2 >= 0:
+                v1 = data[i, j, t1]
+                v2 = data[i, j, t2]
+                alpha = (day - t1) / (t2 - t1)
+                data[i, j, day] = v1 + alpha * (v2 - v1)
+            elif t1 >= 0:
+                data[i, j, day] = data[i, j, t1]
+            elif t2 >= 0:
+                data[i, j, day] = data[i, j, t2]
+
+
+@njit(parallel=True, cache=True)
+def interpolate_cubic_day(data, nanmask, day):
+    """
+    Fill the gaps of a single day in place, as interpolate_cubic_3d would.
+    
+    Args:
+        data: 3D array (lat, lon, time) with NaN gaps, modified in place
+        nanmask: 2D boolean mask for permanently invalid pixels
+        day: Index of the day to fill
+    """
+    rows, cols, times = data.shape
+    
+    for i in prange(rows):
+        # Indices of valid observations, reused for every pixel in the row
+        valid_indices = np.empty(times, dtype=np.int64)
+        
+        for j in range(cols):
+            if nanmask[i, j] or not np.isnan(data[i, j, day]):
+                continue
+            
+            # k: number of valid observations before the day
+            n_valid = 0
+            k = 0
+            for t in range(times):
+                if not np.isnan(data[i, j, t]):
+                    valid_indices[n_valid] = t
+                    n_valid += 1
+                    if t < day:
+                        k = n_valid
+            
+            if n_valid == 0:
+                continue
+            if k == 0:
+                # Leading edge
+                data[i, j, day] = data[i, j, valid_indices[0]]
+                continue
+            if k == n_valid:
+                # Trailing edge
+                data[i, j, day] = data[i, j, valid_indices[n_valid - 1]]
+                continue
+            
+            # The day lies between valid observations k - 1 and k
+            t1 = valid_indices[k - 1]
+            t2 = valid_indices[k]
+            p1 = data[i, j, t1]
+            p2 = data[i, j, t2]
+            
+            if n_valid < 4:
+                # Not enough points for cubic - use linear
+                alpha = (day - t1) / (t2 - t1)
+                data[i, j, day] = p1 + alpha * (p2 - p1)
+            else:
+                # Catmull-Rom spline through the four surrounding points
+                p0 = data[i, j, valid_indices[max(0, k - 2)]]
+                p3 = data[i, j, valid_indices[min(n_valid - 1, k + 1)]]
+                u = (day - t1) / (t2 - t1)
+                u2 = u * u
+                u3 = u2 * u
+                data[i, j, day] = 0.5 * (
+                    (2 * p1) +
+                    (-p0 + p2) * u +
+                    (2 * p0 - 5 * p1 + 4 * p2 - p3) * u2 +
+                    (-p0 + 3 * p1 - 3 * p2 + p3) * u3
+                )
+
+
 # =============================================================================
 # QUALITY CONTROL AND DATA MERGING
 # =============================================================================
@@ -293,6 +426,98 @@ def apply_invalid_mask_3d(data, class_data, invalid_classes):
     return result
 
 
+@njit(parallel=True, nogil=True, cache=True)
+def process_one_day(window_mod, window_myd, window_mod_class, window_myd_class,
+                    nanmask, invalid_lut, currentday_ind, merged_out,
+                    ndsi_current_out, counts_out, clip_high=100.0, head=0):
+    """
+    Mask, merge and sanitize one moving-window step in a single parallel pass.
+    
+    For every pixel:
+        - Outside the DEM (nanmask True): all four window arrays are set to
+          NaN in place, so the mask persists as the window rolls.
+        - Invalid quality class: the Terra/Aqua NDSI value is set to NaN
+          in place (class arrays are left untouched).
+        - Terra is preferred; Aqua fills pixels where Terra is NaN.
+        - Values above clip_high are written to merged_out as NaN.
+    
+    The current day is left raw (not yet sanitized against clip_high) in
+    merged_out and also copied to ndsi_current_out, so spatial correction
+    can read the unmodified day while writing fills into merged_out. The
+    number of NaN current-day pixels inside the ROI is accumulated per
+    row into counts_out.
+    
+    The window arrays may be ring buffers: window day t is stored in slot
+    (t + head) % times, so the caller can overwrite the oldest slot and
+    advance head instead of shifting the whole window every day.
+    merged_out is always written in window order.
+    
+    Args:
+        window_mod: 3D Terra NDSI window (lat, lon, time), modified in place
+        window_myd: 3D Aqua NDSI window, modified in place
+        window_mod_class: 3D Terra quality classes, modified in place
+        window_myd_class: 3D Aqua quality classes, modified in place
+        nanmask: 2D boolean mask for permanently invalid pixels
+        invalid_lut: 256-entry boolean table from build_invalid_class_lut
+        currentday_ind: Index of the current day in the window
+        merged_out: 3D output buffer with the same shape as window_mod
+        ndsi_current_out: 2D output buffer (lat, lon) for the current day
+        counts_out: 1D int64 buffer (lat,) receiving per-row NaN counts
+        clip_high: Values above this are set to NaN (default 100)
+        head: Slot holding the first window day (default 0, no rotation)
+    """
+    rows, cols, times = window_mod.shape
+    n_lut = len(invalid_lut)
+    
+    for i in prange(rows):
+        row_nan_count = 0
+        for j in range(cols):
+            if nanmask[i, j]:
+                for t in range(times):
+                    window_mod[i, j, t] = np.nan
+                    window_myd[i, j, t] = np.nan
+                    window_mod_class[i, j, t] = np.nan
+                    window_myd_class[i, j, t] = np.nan
+                    merged_out[i, j, t] = np.nan
+                ndsi_current_out[i, j] = np.nan
+                continue
+            
+            for t in range(times):
+                s = t + head
+                if s >= times:
+                    s -= times
+                mod_val = window_mod[i, j, s]
+                myd_val = window_myd[i, j, s]
+                mod_cls = window_mod_class[i, j, s]
+                myd_cls = window_myd_class[i, j, s]
+                
+                # Table lookup for integral codes in range (NaN fails the range test)
+                if mod_cls >= 0 and mod_cls < n_lut:
+                    code = int(mod_cls)
+                    if code == mod_cls and invalid_lut[code]:
+                        mod_val = np.nan
+                        window_mod[i, j, s] = mod_val
+                if myd_cls >= 0 and myd_cls < n_lut:
+                    code = int(myd_cls)
+                    if code == myd_cls and invalid_lut[code]:
+                        myd_val = np.nan
+                        window_myd[i, j, s] = myd_val
+                
+                v = myd_val if np.isnan(mod_val) else mod_val
+                if t == currentday_ind:
+                    # Current day stays raw for spatial correction
+                    ndsi_current_out[i, j] = v
+                    merged_out[i, j, t] = v
+                    if np.isnan(v):
+                        row_nan_count += 1
+                    continue
+                if v > clip_high:
+                    v = np.nan
+                merged_out[i, j, t] = v
+        
+        counts_out[i] = row_nan_count
+
+
 @njit(parallel=True, cache=True)
 def merge_terra_aqua_3d(terra_data, aqua_data, terra_class, aqua_class, invalid_classes):
     """
@@ -440,14 +665,42 @@ def apply_spatial_snow_correction(ndsi_data, dem, window_size=3, min_elevation=1
     Returns:
         Tuple of (Corrected NDSI data, count of pixels filled)
     """
-    rows, cols = ndsi_data.shape
     result = ndsi_data.copy()
+    filled_count = apply_spatial_snow_correction_into(
+        ndsi_data, dem, result, window_size, min_elevation
+    )
+    return result, filled_count
+
+
+@njit(parallel=True, cache=True)
+def apply_spatial_snow_correction_into(ndsi_data, dem, result, window_size=3,
+                                       min_elevation=1000.0):
+    """
+    Neighbor-based snow correction writing fills into a caller buffer.
+    
+    Same algorithm as apply_spatial_snow_correction, but neighbors are read
+    from ndsi_data while filled pixels are written to result, which must
+    hold the same values as ndsi_data on entry (e.g. a view into the merged
+    window). Reading and writing separate arrays keeps fills from feeding
+    back into neighbor checks.
+    
+    Args:
+        ndsi_data: 2D NDSI values (read only)
+        dem: 2D elevation data
+        result: 2D output buffer, equal to ndsi_data on entry
+        window_size: Size of neighborhood window (default 3x3)
+        min_elevation: Minimum elevation to apply correction (default 1000m)
+    
+    Returns:
+        Count of pixels filled
+    """
+    rows, cols = ndsi_data.shape
     half_window = window_size // 2
     filled_count = 0
     
     for i in prange(rows):
         for j in range(cols):
-            if not np.isnan(result[i, j]):
+            if not np.isnan(ndsi_data[i, j]):
                 continue
             
             pixel_elev = dem[i, j]
@@ -487,7 +740,7 @@ def apply_spatial_snow_correction(ndsi_data, dem, window_size=3, min_elevation=1
                     result[i, j] = 100.0
                     filled_count += 1
     
-    return result, filled_count
+    return filled_count
 
 
 @njit(parallel=True, cache=True)
@@ -515,40 +768,65 @@ def apply_old_spatial_snow_correction(ndsi_data, dem, threshold_elevation=1000.0
     Returns:
         Tuple of (Corrected NDSI data, count of pixels filled)
     """
-    rows, cols = ndsi_data.shape
     result = ndsi_data.copy()
+    filled_count = apply_old_spatial_snow_correction_inplace(
+        result, dem, threshold_elevation, snow_threshold, max_gap_ratio
+    )
+    return result, filled_count
+
+
+@njit(parallel=True, cache=True)
+def apply_old_spatial_snow_correction_inplace(ndsi_data, dem, threshold_elevation=1000.0,
+                                               snow_threshold=100.0, max_gap_ratio=0.60):
+    """
+    Elevation-mean snow correction applied in place.
+    
+    Same algorithm as apply_old_spatial_snow_correction, writing fills
+    directly into ndsi_data (e.g. a view into the merged window). Safe
+    in place because each fill depends only on the pixel itself, the DEM
+    and statistics gathered before any pixel is written.
+    
+    Args:
+        ndsi_data: 2D NDSI values for current day, modified in place
+        dem: 2D elevation data (meters)
+        threshold_elevation: Minimum elevation to consider (default 1000m)
+        snow_threshold: Value indicating full snow cover (default 100)
+        max_gap_ratio: Maximum acceptable gap ratio (default 0.60)
+    
+    Returns:
+        Count of pixels filled
+    """
+    rows, cols = ndsi_data.shape
+    result = ndsi_data
     filled_count = 0
     
-    # Count gaps at high elevation
+    # Count gaps at high elevation and gather the elevation of snowy
+    # pixels in the same pass over the day
     high_elev_count = 0
     high_elev_gap_count = 0
+    snow_elev_sum = 0.0
+    snow_count = 0
     
     for i in range(rows):
         for j in range(cols):
+            v = result[i, j]
             if dem[i, j] > threshold_elevation:
                 high_elev_count += 1
-                if np.isnan(result[i, j]):
+                if np.isnan(v):
                     high_elev_gap_count += 1
+            if v == snow_threshold:
+                snow_elev_sum += dem[i, j]
+                snow_count += 1
     
     if high_elev_count == 0:
-        return result, 0
+        return 0
     
     gap_ratio = high_elev_gap_count / high_elev_count
     if gap_ratio >= max_gap_ratio:
-        return result, 0
-    
-    # Find mean elevation of snowy pixels
-    snow_elev_sum = 0.0
-    snow_count = 0
-    
-    for i in range(rows):
-        for j in range(cols):
-            if result[i, j] == snow_threshold:
-                snow_elev_sum += dem[i, j]
-                snow_count += 1
+        return 0
     
     if snow_count <= 10:
-        return result, 0
+        return 0
     
     mean_snow_elevation = snow_elev_sum / snow_count
     
@@ -559,7 +837,7 @@ def apply_old_spatial_snow_correction(ndsi_data, dem, threshold_elevation=1000.0
                 result[i, j] = snow_threshold
                 filled_count += 1
     
-    return result, filled_count
+    return filled_count
 
 
 # =============================================================================
@@ -589,6 +867,34 @@ def clip_values_3d(data, min_val, max_val):
     return result
 
 
+@njit(parallel=True, cache=True)
+def clip_and_zero_2d(data, zero_mask, min_val, max_val):
+    """
+    Clip a 2D day to [min_val, max_val] in place and zero masked pixels.
+    
+    Same result as np.clip followed by data[zero_mask] = 0 (NaN stays
+    NaN outside the mask), in one pass.
+    
+    Args:
+        data: 2D array, modified in place (may be a strided view)
+        zero_mask: 2D boolean mask of pixels set to 0
+        min_val: Lower bound
+        max_val: Upper bound
+    """
+    rows, cols = data.shape
+    
+    for i in prange(rows):
+        for j in range(cols):
+            if zero_mask[i, j]:
+                data[i, j] = 0
+            else:
+                val = data[i, j]
+                if val < min_val:
+                    data[i, j] = min_val
+                elif val > max_val:
+                    data[i, j] = max_val
+
+
 @njit(parallel=True, cache=True)
 def apply_nanmask_3d(data, nanmask):
     """
@@ -608,6 +914,135 @@ def apply_nanmask_3d(data, nanmask):
     return result
 
 
+@njit(parallel=True, nogil=True, cache=True)
+def count_nan_in_roi(data, nanmask):
+    """
+    Count NaN pixels inside the region of interest.
+    
+    Equivalent to np.count_nonzero(np.isnan(data) & ~nanmask) for 2D data, computed
+    as a parallel reduction without temporary boolean arrays.
+    """
+    rows, cols = data.shape
+    count = 0
+    
+    for i in prange(rows):
+        for j in range(cols):
+            if not nanmask[i, j] and np.isnan(data[i, j]):
+                count += 1
+    
+    return count
+
+
+@njit(parallel=True, cache=True)
+def mask_invalid_classes(values, classes, invalid_lut, out):
+    """
+    Copy values to out, writing NaN where the class code is invalid.
+    
+    Fuses the class lookup, the copy and the NaN store into one parallel
+    pass over flat (1D) arrays. NaN or non-integer class codes, and codes
+    outside 0-255, are treated as valid, as with np.isin.
+    
+    Args:
+        values: 1D array of NDSI values
+        classes: 1D array of class codes, same size as values
+        invalid_lut: 256-entry boolean table from build_invalid_class_lut
+        out: 1D float output array, same size as values (may be values)
+    """
+    for i in prange(values.size):
+        c = classes[i]
+        if c >= 0 and c < 256 and np.int64(c) == c and invalid_lut[np.int64(c)]:
+            out[i] = np.nan
+        else:
+            out[i] = values[i]
+    
+    return
+
+
+@njit(parallel=True, cache=True)
+def mask_invalid_classes_pair(terra_values, terra_classes, aqua_values, aqua_classes,
+                              invalid_lut, out_terra, out_aqua):
+    """
+    Apply mask_invalid_classes to Terra and Aqua arrays in one pass.
+    
+    Both sensors are masked inside the same parallel loop, so the grid is
+    traversed once instead of twice.
+    
+    Args:
+        terra_values: 1D array of Terra NDSI values
+        terra_classes: 1D array of Terra class codes
+        aqua_values: 1D array of Aqua NDSI values
+        aqua_classes: 1D array of Aqua class codes
+        invalid_lut: 256-entry boolean table from build_invalid_class_lut
+        out_terra: 1D float output array for Terra (may be terra_values)
+        out_aqua: 1D float output array for Aqua (may be aqua_values)
+    """
+    for i in prange(terra_values.size):
+        c = terra_classes[i]
+        if c >= 0 and c < 256 and np.int64(c) == c and invalid_lut[np.int64(c)]:
+            out_terra[i] = np.nan
+        else:
+            out_terra[i] = terra_values[i]
+        
+        c = aqua_classes[i]
+        if c >= 0 and c < 256 and np.int64(c) == c and invalid_lut[np.int64(c)]:
+            out_aqua[i] = np.nan
+        else:
+            out_aqua[i] = aqua_values[i]
+    
+    return
+
+
+@njit(parallel=True, cache=True)
+def cast_float64_with_nanmask(src, dst, mask):
+    """
+    Copy a 2D array into a float64 buffer and flag its NaN pixels.
+    
+    Equivalent to dst[:] = src.astype(np.float64); mask[:] = np.isnan(dst),
+    fused into a single parallel pass over memory.
+    
+    Args:
+        src: 2D input array (any real dtype, any memory layout)
+        dst: 2D float64 output array, same shape as src
+        mask: 2D boolean output array, same shape as src
+    """
+    rows, cols = src.shape
+    
+    for i in prange(rows):
+        for j in range(cols):
+            v = np.float64(src[i, j])
+            dst[i, j] = v
+            mask[i, j] = v != v
+    
+    return
+
+
+@njit(parallel=True, cache=True)
+def dequantize_uint8_3d(src, fill_value, dst):
+    """
+    Expand uint8-quantized NDSI into a float buffer, restoring NaN gaps.
+    
+    Equivalent to dst[:] = np.where(src == fill_value, np.nan, src), fused
+    into a single parallel pass so the float copy is written exactly once.
+    
+    Args:
+        src: 3D uint8 array (lat, lon, time) of NDSI values
+        fill_value: Code marking missing values (e.g. 255)
+        dst: 3D float32/float64 output array, same shape as src
+    """
+    rows, cols, times = src.shape
+    
+    for i in prange(rows):
+        for j in range(cols):
+            for t in range(times):
+                v = src[i, j, t]
+                if v == fill_value:
+                    dst[i, j, t] = np.nan
+                else:
+                    dst[i, j, t] = v
+    
+    return
+
+
 @njit(cache=True)
 def set_values_above_threshold_to_nan(data, threshold):
     """
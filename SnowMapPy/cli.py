@@ -426,6 +426,8 @@ Examples:
     parser.add_argument('--crs', type=str, default='EPSG:4326', help='CRS (default: EPSG:4326)')
     parser.add_argument('--save-original', action='store_true', help='Save original data')
     parser.add_argument('--save-counters', action='store_true', help='Save pixel counters CSV')
+    parser.add_argument('--memmap', action='store_true',
+                        help='Keep the processed series in a temporary file instead of RAM')
     parser.add_argument('--version', action='version', version='SnowMapPy v0.0.1')
     
     args = parser.parse_args()
@@ -480,7 +482,8 @@ Examples:
             interpolation_method=args.interpolation,
             spatial_correction_method=spatial_map[args.spatial_correction],
             verbose=True,
-            save_pixel_counters=args.save_counters
+            save_pixel_counters=args.save_counters,
+            use_memmap=args.memmap
         )
         
         print_complete("Processing completed successfully!")
@@ -56,15 +56,16 @@ import ee
 import numpy as np
 import geemap
 import xarray as xr
-import geopandas as gpd
 from .auth import initialize_earth_engine
 from ..core.console import print_info, print_success, print_error, print_warning, suppress_warnings
+from ..core.data_io import load_shapefile
 
 # Suppress warnings on module load
 suppress_warnings()
 
 # Enable automatic SHX restoration for corrupted/missing .shx files
-os.environ['SHAPE_RESTORE_SHX'] = 'YES'
+# (unless the user has configured it explicitly)
+os.environ.setdefault('SHAPE_RESTORE_SHX', 'YES')
 
 
 def _check_and_restore_shx(shapefile_path: str) -> bool:
@@ -164,8 +165,8 @@ def load_modis_cloud_data(project_name, shapefile_path, start_date, end_date, cr
     # Check for SHX file issues before loading
     _check_and_restore_shx(shapefile_path)
     
-    # Load shapefile
-    roi_original = gpd.read_file(shapefile_path)
+    # Load shapefile (cached across calls for an unchanged file)
+    roi_original = load_shapefile(shapefile_path)
     
     # Reproject shapefile to target CRS for GEE clipping
     if roi_original.crs != target_crs:
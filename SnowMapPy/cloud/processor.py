@@ -14,35 +14,55 @@ Authors: Haytam Elyoussfi, Hatim Bechri
 Version: 0.0.1
 """
 
+import gc
 import os
+import csv
+import dask
+import zarr
 import numpy as np
 import pandas as pd
 import xarray as xr
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from tqdm import tqdm
 from typing import Literal, Optional, Tuple
 
 # Import optimized modules
-from ..core.data_io import save_as_zarr, load_dem_and_nanmask
-from ..core.temporal import interpolate_temporal, get_interpolation_methods
+from ..core.data_io import save_as_zarr, load_dem_and_nanmask, NDSI_COMPRESSOR
+from ..core.temporal import interpolate_temporal_day, get_interpolation_methods
 from ..core.quality import get_invalid_modis_classes
-from ..core.utils import generate_time_series
+from ..core.utils import generate_time_series, compute_balanced_chunks
+from ..core.memory import allocate_cube, acquire_buffer, release_buffer
 from ..core.console import (
     print_header, print_section, print_success, print_error, 
     print_info, print_config, print_banner, print_complete,
-    print_warning, suppress_warnings, green, blue, dim
+    print_warning, suppress_warnings, set_verbose, green, blue, dim
 )
 from .loader import load_modis_cloud_data
 
+# Optional vectorized CSV writer for pixel counters
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
 # Suppress warnings on module load
 suppress_warnings()
 
 # Import Numba kernels for maximum performance
 from .._numba_kernels import (
     merge_terra_aqua_3d,
+    process_one_day,
+    count_nan_in_roi,
+    clip_and_zero_2d,
+    build_invalid_class_lut,
     apply_elevation_snow_correction,
     apply_spatial_snow_correction,
+    apply_spatial_snow_correction_into,
     apply_old_spatial_snow_correction,
-    clip_values_3d,
+    apply_old_spatial_snow_correction_inplace,
     apply_nanmask_3d,
     INVALID_CLASSES
 )
@@ -72,7 +92,7 @@ def _prepare_dem_data(dem_ds: xr.Dataset) -> Tuple[np.ndarray, np.ndarray]:
     Returns
     -------
     dem : np.ndarray
-        2D elevation array (lat, lon).
+        2D elevation array (lat, lon), float32.
     nanmask : np.ndarray
         2D boolean mask for invalid pixels.
     """
@@ -81,13 +101,9 @@ def _prepare_dem_data(dem_ds: xr.Dataset) -> Tuple[np.ndarray, np.ndarray]:
         dem_ds = dem_ds.transpose('lat', 'lon', 'time')
         dem_ds = dem_ds.isel(time=0)
     
-    # Get elevation data - handle Dask arrays
-    dem_data = dem_ds['elevation']
-    if hasattr(dem_data, 'data') and hasattr(dem_data.data, 'compute'):
-        # Dask array - compute to numpy
-        dem = dem_data.values.astype(np.float64)
-    else:
-        dem = dem_data.values.astype(np.float64)
+    # Get elevation data - .values computes Dask arrays to numpy
+    # float32 matches the working precision of the processing window
+    dem = dem_ds['elevation'].values.astype(np.float32, copy=False)
     
     # Handle 3D case
     if dem.ndim == 3:
@@ -98,53 +114,141 @@ def _prepare_dem_data(dem_ds: xr.Dataset) -> Tuple[np.ndarray, np.ndarray]:
     return dem, nanmask
 
 
-def _load_or_create_nan_array(
-    dataset: xr.Dataset,
-    date: pd.Timestamp,
-    shape: Tuple[int, int],
-    var_name: str
-) -> np.ndarray:
+def _build_time_index(dataset: xr.Dataset) -> pd.DatetimeIndex:
     """
-    Load data for specific date or create NaN array if missing.
+    Build a hashed, day-resolution index of a dataset's time coordinate.
     
-    MEMORY OPTIMIZATION: Handles both Dask-backed and numpy-backed arrays.
-    For Dask arrays, only computes the specific time slice needed.
-    
-    This is a critical function called many times during processing.
-    Optimized for fast date lookup with minimal memory footprint.
+    Built once per dataset so that per-day lookups are O(1) hash lookups
+    followed by a positional ``isel``, instead of a linear scan of
+    ``dataset.time.values`` plus a label-based ``sel`` on every call.
+    Accepts datetime64 or 'YYYY-MM-DD' string coordinates.
     
     Parameters
     ----------
     dataset : xr.Dataset
-        Dataset containing the variable (can be Dask-backed).
-    date : pd.Timestamp
-        Date to extract.
-    shape : tuple
-        Shape of output array (lat, lon).
-    var_name : str
-        Variable name to extract.
+        Dataset with a time coordinate.
         
     Returns
     -------
-    np.ndarray
-        Data for the date, or NaN array if date not available.
-        Always returns a numpy array (not Dask).
+    pd.DatetimeIndex
+        Time coordinate normalized to midnight (day resolution).
+    """
+    return pd.DatetimeIndex(pd.to_datetime(dataset.time.values)).normalize()
+
+
+# Number of days materialized per batched read in process_files_array
+SLAB_DAYS = 30
+
+
+class _TimeSlabReader:
     """
-    date_str = date.strftime('%Y-%m-%d')
+    Serve daily slices of a dataset variable from batched time slabs.
+    
+    Instead of computing one time step per call (one small Dask graph per
+    day and variable), the reader materializes ``slab_days`` consecutive
+    days of the series in a single ``isel`` + ``.values`` and then serves
+    window slots from that in-memory slab. Dates missing from the dataset
+    are NaN in the slab. The slab buffer is allocated once and reused.
+    
+    With ``prefetch`` enabled, the slab is split into two half-size
+    buffers: while days are served from one, the next slab is read into
+    the other on a background thread, so the (often remote) reads overlap
+    with processing at the same memory footprint.
     
-    # Fast check if date exists in dataset
-    if date_str in dataset.time.values:
-        data = dataset.sel(time=date_str)[var_name]
+    Parameters
+    ----------
+    dataset : xr.Dataset
+        Dataset with (lat, lon, time) dimension order (can be Dask-backed).
+    var_name : str
+        Variable name to read.
+    series : pd.DatetimeIndex
+        Complete daily time series; reads are addressed by position in it.
+    time_index : pd.DatetimeIndex
+        Index of the dataset's time coordinate from ``_build_time_index``.
+    shape : tuple
+        Spatial shape (lat, lon).
+    slab_days : int
+        Number of series days held in memory by the reader.
+    prefetch : bool
+        Read the next slab in the background. Default True.
+    """
+    
+    def __init__(self, dataset, var_name, series, time_index, shape,
+                 slab_days=SLAB_DAYS, prefetch=True):
+        self.data = dataset[var_name]
+        self.time_index = time_index
+        self.series = series.normalize()
+        if prefetch:
+            slab_days = -(-slab_days // 2)
+        self.slab_days = max(1, min(slab_days, len(series)))
+        self.slab = np.empty(shape + (self.slab_days,), dtype=np.float32)
+        self.start = 0
+        self.stop = 0
         
-        # Handle Dask arrays: compute only this slice
-        if hasattr(data, 'data') and hasattr(data.data, 'compute'):
-            # Dask array - compute to numpy
-            return data.values.astype(np.float64)
+        # Background read state: second buffer, executor and the pending
+        # (start, stop, future) of the slab being read into it
+        self._next = np.empty_like(self.slab) if prefetch else None
+        self._executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+        self._pending = None
+    
+    def _fill(self, buf: np.ndarray, pos: int) -> int:
+        """Read the slab starting at series position ``pos`` into ``buf``."""
+        stop = min(pos + self.slab_days, len(self.series))
+        indices = self.time_index.get_indexer(self.series[pos:stop])
+        slots = np.flatnonzero(indices >= 0)
+        
+        buf.fill(np.nan)
+        if len(slots):
+            # One batched read for all available days of the slab
+            buf[:, :, slots] = self.data.isel(time=indices[slots]).values
+        return stop
+    
+    def _load(self, pos: int) -> None:
+        """Make the slab starting at series position ``pos`` current."""
+        pending, self._pending = self._pending, None
+        if pending is not None:
+            # Wait even when unused: the buffer must not be written twice
+            pending[2].result()
+        
+        if pending is not None and pending[0] == pos:
+            self.slab, self._next = self._next, self.slab
+            stop = pending[1]
         else:
-            # Already numpy
-            return data.values.astype(np.float64)
-    else:
-        return np.full(shape, np.nan, dtype=np.float64)
+            stop = self._fill(self.slab, pos)
+        
+        self.start = pos
+        self.stop = stop
+        
+        if self._executor is not None and stop < len(self.series):
+            next_stop = min(stop + self.slab_days, len(self.series))
+            future = self._executor.submit(self._fill, self._next, stop)
+            self._pending = (stop, next_stop, future)
+    
+    def close(self) -> None:
+        """Wait for any background read and stop the reader thread."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self._pending = None
+    
+    def read(self, pos: int, out: np.ndarray) -> np.ndarray:
+        """Copy the day at series position ``pos`` into ``out``."""
+        if not self.start <= pos < self.stop:
+            self._load(pos)
+        np.copyto(out, self.slab[:, :, pos - self.start])
+        return out
+    
+    def read_window(self, pos: int, out: np.ndarray) -> np.ndarray:
+        """Copy ``out.shape[2]`` consecutive days starting at ``pos`` into ``out``."""
+        n_days = out.shape[2]
+        if n_days > self.slab_days:
+            for k in range(n_days):
+                self.read(pos + k, out[:, :, k])
+            return out
+        if not (self.start <= pos and pos + n_days <= self.stop):
+            self._load(pos)
+        np.copyto(out, self.slab[:, :, pos - self.start:pos - self.start + n_days])
+        return out
 
 
 def process_files_array(
@@ -152,9 +256,9 @@ def process_files_array(
     movwind: range,
     currentday_ind: int,
     mod_data: xr.Dataset,
-    myd_data: xr.Dataset,
+    myd_data: Optional[xr.Dataset],
     mod_class_data: xr.Dataset,
-    myd_class_data: xr.Dataset,
+    myd_class_data: Optional[xr.Dataset],
     dem: np.ndarray,
     nanmask: np.ndarray,
     daysbefore: int,
@@ -163,7 +267,9 @@ def process_files_array(
     interpolation_method: InterpolationMethod = "nearest",
     spatial_correction_method: SpatialCorrectionMethod = "old",
     verbose: bool = True,
-    save_pixel_counters: bool = False
+    save_pixel_counters: bool = False,
+    output_dtype: str = 'float32',
+    use_memmap: bool = False
 ) -> Tuple[np.ndarray, list, dict]:
     """
     Process MODIS time series using 6-day moving window approach with quality control.
@@ -176,9 +282,10 @@ def process_files_array(
     This is the core processing function, heavily optimized with Numba.
     Supports both Dask-backed (lazy) and numpy-backed datasets.
     
-    MEMORY OPTIMIZATION: Only the current 6-day window is materialized in RAM
-    at any given time, enabling processing of multi-decade time series without
-    running out of memory.
+    MEMORY OPTIMIZATION: Input is read in slabs of SLAB_DAYS days (one
+    batched Dask compute per slab) and only the current slab plus the 6-day
+    window is materialized in RAM at any given time, enabling processing of
+    multi-decade time series without running out of memory.
     
     Parameters
     ----------
@@ -190,12 +297,14 @@ def process_files_array(
         Index of current day in the window (3 for 6-day window).
     mod_data : xr.Dataset
         Terra NDSI dataset (can be Dask-backed).
-    myd_data : xr.Dataset
-        Aqua NDSI dataset (can be Dask-backed).
+    myd_data : xr.Dataset or None
+        Aqua NDSI dataset (can be Dask-backed). None when Aqua is not
+        available; the Aqua window is then kept all-NaN and never read.
     mod_class_data : xr.Dataset
         Terra quality class dataset (can be Dask-backed).
-    myd_class_data : xr.Dataset
-        Aqua quality class dataset (can be Dask-backed).
+    myd_class_data : xr.Dataset or None
+        Aqua quality class dataset (can be Dask-backed). None together
+        with ``myd_data``.
     dem : np.ndarray
         Digital Elevation Model (lat, lon).
     nanmask : np.ndarray
@@ -217,24 +326,34 @@ def process_files_array(
         Whether to print progress messages.
     save_pixel_counters : bool
         Whether to track pixel counters. Default False.
+    output_dtype : str
+        Dtype of the returned array: 'float16', 'float32' (default) or
+        'float64'. Processing runs in float32; each finished day is cast
+        on write, so the full series is never held at higher precision.
+        float16 loses only sub-0.01% precision on the 0-100 NDSI range.
+    use_memmap : bool
+        Whether to back the output array with a temporary memory-mapped
+        file (see ``allocate_cube``) so series larger than RAM can be
+        processed. Default False.
         
     Returns
     -------
     out_arr : np.ndarray
-        Processed NDSI array (lat, lon, time).
+        Processed NDSI array (lat, lon, time) in ``output_dtype``.
     out_dates : list
         List of processed dates.
     counters : dict
         Dictionary with pixel counters for each date (empty if save_pixel_counters=False).
     """
-    # Get dimensions
-    mod_arr = mod_data[var_name].values
-    lat_dim, lon_dim, _ = mod_arr.shape
+    # Get dimensions (DataArray.shape does not compute Dask-backed data)
+    lat_dim, lon_dim, _ = mod_data[var_name].shape
     n_processed = len(series) - daysbefore - daysafter
     
-    # Pre-allocate output array
-    out_arr = np.empty((lat_dim, lon_dim, n_processed), dtype=np.float64)
-    out_dates = []
+    # Pre-allocate output array directly in the requested output dtype
+    if use_memmap:
+        out_arr = allocate_cube((lat_dim, lon_dim, n_processed), output_dtype)
+    else:
+        out_arr = np.empty((lat_dim, lon_dim, n_processed), dtype=output_dtype)
     
     # Initialize counters dictionary
     counters = {
@@ -244,154 +363,217 @@ def process_files_array(
         'temporal_filled_count': []
     }
     
-    # Count total valid pixels inside ROI (not NaN from clipping)
-    total_pixels_inside_roi = np.sum(~nanmask)
+    # Day-invariant mask, computed once instead of on every iteration:
+    # pixels below 1000m are forced to 0 (no snow)
+    low_elevation_mask = dem < 1000
     
-    # Get invalid classes as numpy array for Numba
-    invalid_classes = np.array(get_invalid_modis_classes(), dtype=np.float64)
+    # Invalid classes as a 256-entry lookup table for Numba
+    invalid_lut = build_invalid_class_lut(get_invalid_modis_classes())
     
     # Window size
     window_size = len(movwind)
     
+    # Batched readers: each materializes SLAB_DAYS days per read instead of
+    # computing one time step per day, with hashed date lookups built once
+    shape = (lat_dim, lon_dim)
+    mod_reader = _TimeSlabReader(mod_data, var_name, series, _build_time_index(mod_data), shape)
+    mod_class_reader = _TimeSlabReader(
+        mod_class_data, 'NDSI_Snow_Cover_Class', series, _build_time_index(mod_class_data), shape
+    )
+    aqua_available = myd_data is not None
+    if aqua_available:
+        myd_reader = _TimeSlabReader(myd_data, var_name, series, _build_time_index(myd_data), shape)
+        myd_class_reader = _TimeSlabReader(
+            myd_class_data, 'NDSI_Snow_Cover_Class', series, _build_time_index(myd_class_data), shape
+        )
+    readers = [mod_reader, mod_class_reader]
+    if aqua_available:
+        readers += [myd_reader, myd_class_reader]
+    
     # Progress bar
     iterator = range(daysbefore, len(series) - daysafter)
     if verbose:
         iterator = tqdm(iterator, desc="Processing MODIS time series")
     
-    # Initialize window arrays (will be rolled efficiently)
+    # Initialize window arrays. They are ring buffers: the slot at index
+    # head holds the first window day, and each new day overwrites the
+    # oldest slot instead of the whole window being shifted
     window_mod = None
     window_myd = None
     window_mod_class = None
     window_myd_class = None
-    
-    for i in iterator:
-        if i == daysbefore:
-            # Initialize moving window - load all window data
-            window_mod = np.stack([
-                _load_or_create_nan_array(mod_data, series[i + j], (lat_dim, lon_dim), var_name)
-                for j in movwind
-            ], axis=-1)
-            window_myd = np.stack([
-                _load_or_create_nan_array(myd_data, series[i + j], (lat_dim, lon_dim), var_name)
-                for j in movwind
-            ], axis=-1)
-            window_mod_class = np.stack([
-                _load_or_create_nan_array(mod_class_data, series[i + j], (lat_dim, lon_dim), 'NDSI_Snow_Cover_Class')
-                for j in movwind
-            ], axis=-1)
-            window_myd_class = np.stack([
-                _load_or_create_nan_array(myd_class_data, series[i + j], (lat_dim, lon_dim), 'NDSI_Snow_Cover_Class')
-                for j in movwind
-            ], axis=-1)
-        else:
-            # Roll window forward (efficient in-place operation)
-            window_mod = np.roll(window_mod, -1, axis=2)
-            window_myd = np.roll(window_myd, -1, axis=2)
-            window_mod_class = np.roll(window_mod_class, -1, axis=2)
-            window_myd_class = np.roll(window_myd_class, -1, axis=2)
+    head = 0
+    
+    # Merge buffers reused across iterations
+    merged = np.empty((lat_dim, lon_dim, window_size), dtype=np.float32)
+    # Current-day view of merged, taken once: every step after the merge
+    # (spatial correction, interpolation, clipping) works on it in place
+    currentday_ind = int(currentday_ind)
+    current_view = merged[:, :, currentday_ind]
+    method_lower = spatial_correction_method.lower()
+    ndsi_current = np.empty((lat_dim, lon_dim), dtype=np.float32)
+    row_nan_counts = np.zeros(lat_dim, dtype=np.int64)
+    
+    # Window buffers go back to the pool and the readers' prefetch threads
+    # stop even when a read or a kernel raises
+    try:
+        for i in iterator:
+            if i == daysbefore:
+                # Initialize moving window - load all window data into preallocated buffers
+                window_shape = (lat_dim, lon_dim, window_size)
+                window_mod = acquire_buffer(window_shape, np.float32)
+                window_myd = acquire_buffer(window_shape, np.float32)
+                window_mod_class = acquire_buffer(window_shape, np.float32)
+                window_myd_class = acquire_buffer(window_shape, np.float32)
+                
+                # One block copy per dataset from a single batched slab read
+                window_start = i + movwind[0]
+                mod_reader.read_window(window_start, window_mod)
+                mod_class_reader.read_window(window_start, window_mod_class)
+                if aqua_available:
+                    myd_reader.read_window(window_start, window_myd)
+                    myd_class_reader.read_window(window_start, window_myd_class)
+                else:
+                    # Without Aqua the window stays all-NaN (NaN classes are never
+                    # flagged invalid), so it is filled once and never reloaded
+                    window_myd.fill(np.nan)
+                    window_myd_class.fill(np.nan)
+            else:
+                # Load the new day directly into the oldest slot, which becomes
+                # the last window day once head advances
+                mod_reader.read(i + daysafter, window_mod[:, :, head])
+                mod_class_reader.read(i + daysafter, window_mod_class[:, :, head])
+                
+                if aqua_available:
+                    myd_reader.read(i + daysafter, window_myd[:, :, head])
+                    myd_class_reader.read(i + daysafter, window_myd_class[:, :, head])
+                
+                head = head + 1 if head + 1 < window_size else 0
             
-            # Load new data for end of window
-            window_mod[:, :, -1] = _load_or_create_nan_array(
-                mod_data, series[i + daysafter], (lat_dim, lon_dim), var_name
-            )
-            window_myd[:, :, -1] = _load_or_create_nan_array(
-                myd_data, series[i + daysafter], (lat_dim, lon_dim), var_name
-            )
-            window_mod_class[:, :, -1] = _load_or_create_nan_array(
-                mod_class_data, series[i + daysafter], (lat_dim, lon_dim), 'NDSI_Snow_Cover_Class'
-            )
-            window_myd_class[:, :, -1] = _load_or_create_nan_array(
-                myd_class_data, series[i + daysafter], (lat_dim, lon_dim), 'NDSI_Snow_Cover_Class'
-            )
-        
-        # Apply DEM mask and invalid class mask to the original window arrays IN-PLACE
-        # This matches the old behavior where masks persist across rolling iterations
-        # Old code: window_mod[nanmask, :] = np.nan; window_mod[MOD_class_invalid] = np.nan
-        
-        # Apply DEM nanmask in-place (old: window_mod[nanmask, :] = np.nan)
-        window_mod[nanmask, :] = np.nan
-        window_myd[nanmask, :] = np.nan
-        window_mod_class[nanmask, :] = np.nan
-        window_myd_class[nanmask, :] = np.nan
-        
-        # Apply class-based invalid mask in-place (old: window_mod[MOD_class_invalid] = np.nan)
-        MOD_class_invalid = np.isin(window_mod_class, invalid_classes)
-        MYD_class_invalid = np.isin(window_myd_class, invalid_classes)
-        window_mod[MOD_class_invalid] = np.nan
-        window_myd[MYD_class_invalid] = np.nan
-        
-        # Merge Terra and Aqua with quality control
-        # Old merge logic: MERGEind = np.isnan(window_mod) & ~np.isnan(window_myd)
-        #                  NDSIFill_MERGE = np.where(MERGEind, window_myd, window_mod)
-        merge_ind = np.isnan(window_mod) & ~np.isnan(window_myd)
-        merged = np.where(merge_ind, window_myd, window_mod)
-        
-        # Get current day NDSI before interpolation
-        ndsi_current = merged[:, :, currentday_ind].copy()
-        
-        # Count original NaN pixels INSIDE ROI (before spatial correction)
-        # Only count NaN where nanmask is False (inside the shape)
-        original_nan_inside_roi = np.sum(np.isnan(ndsi_current) & ~nanmask)
-        
-        # Apply spatial snow correction based on selected method
-        # Support both technical names and legacy names
-        spatial_filled = 0
-        method_lower = spatial_correction_method.lower()
-        if method_lower in ("new", "neighbor_based"):
-            ndsi_current, spatial_filled = apply_spatial_snow_correction(
-                ndsi_current, dem, window_size=5, min_elevation=1000.0
+            # Apply DEM mask and invalid class mask to the original window arrays IN-PLACE,
+            # then merge Terra and Aqua with quality control - all in one parallel pass.
+            # This matches the old behavior where masks persist across rolling iterations
+            # Old code: window_mod[nanmask, :] = np.nan; window_mod[MOD_class_invalid] = np.nan
+            # Old merge logic: MERGEind = np.isnan(window_mod) & ~np.isnan(window_myd)
+            #                  NDSIFill_MERGE = np.where(MERGEind, window_myd, window_mod)
+            # Values > 100 are set to NaN in the same pass, except on the current
+            # day, which is kept raw in merged (and in ndsi_current) for spatial
+            # correction
+            process_one_day(
+                window_mod, window_myd, window_mod_class, window_myd_class,
+                nanmask, invalid_lut, currentday_ind,
+                merged, ndsi_current, row_nan_counts, 100.0, head
             )
-        elif method_lower in ("old", "elevation_mean"):
-            ndsi_current, spatial_filled = apply_old_spatial_snow_correction(
-                ndsi_current, dem, threshold_elevation=1000.0
-            )
-        # else: "none" - no spatial correction applied
-        
-        # Update merged with corrected current day
-        merged[:, :, currentday_ind] = ndsi_current
-        
-        # Set values > 100 to NaN (invalid NDSI values)
-        merged = np.where(merged > 100, np.nan, merged)
-        
-        # Count NaN before temporal interpolation (inside ROI)
-        nan_before_temporal = np.sum(np.isnan(merged[:, :, currentday_ind]) & ~nanmask)
-        
-        # Temporal interpolation using selected method (Numba-accelerated)
-        merged = interpolate_temporal(merged, nanmask, method=interpolation_method)
-        
-        # Count NaN after temporal interpolation (inside ROI)
-        nan_after_temporal = np.sum(np.isnan(merged[:, :, currentday_ind]) & ~nanmask)
-        
-        # Calculate temporal filled count
-        temporal_filled = nan_before_temporal - nan_after_temporal
-        
-        # Clip to valid NDSI range [0, 100]
-        merged = clip_values_3d(merged, 0.0, 100.0)
-        
-        # Extract current day result
-        ndsi_final = merged[:, :, currentday_ind]
-        
-        # Set all pixels below 1000m elevation to 0 (no snow)
-        # Snow is unlikely at low elevations, matching local processor behavior
-        low_elevation_mask = dem < 1000
-        ndsi_final[low_elevation_mask] = 0
-        
-        # Store result
-        out_arr[:, :, i - daysbefore] = ndsi_final
-        out_dates.append(series[i])
-        
-        # Store counters for this date (only if enabled)
-        if save_pixel_counters:
-            counters['date'].append(series[i].strftime('%Y-%m-%d'))
-            counters['original_nan_count'].append(int(original_nan_inside_roi))
-            counters['spatial_filled_count'].append(int(spatial_filled))
-            counters['temporal_filled_count'].append(int(temporal_filled))
+            
+            # Apply spatial snow correction based on selected method
+            # Support both technical names and legacy names
+            # Fills are written straight into the current-day view of merged;
+            # the neighbor-based method reads neighbors from ndsi_current
+            spatial_filled = 0
+            if method_lower in ("new", "neighbor_based"):
+                spatial_filled = apply_spatial_snow_correction_into(
+                    ndsi_current, dem, current_view, 5, 1000.0
+                )
+            elif method_lower in ("old", "elevation_mean"):
+                spatial_filled = apply_old_spatial_snow_correction_inplace(
+                    current_view, dem, 1000.0, 100.0, 0.60
+                )
+            # else: "none" - no spatial correction applied
+            
+            # Set values > 100 to NaN (invalid NDSI values) on the corrected day
+            np.putmask(current_view, current_view > 100, np.nan)
+            
+            # Count NaN before temporal interpolation (inside ROI)
+            nan_before_temporal = count_nan_in_roi(current_view, nanmask)
+            
+            if nan_before_temporal == 0:
+                # Current day already complete inside the ROI
+                nan_after_temporal = 0
+            else:
+                # Temporal interpolation using selected method (Numba-accelerated).
+                # Only the current day is emitted, so only its gaps are filled,
+                # in place in the merged window
+                interpolate_temporal_day(merged, nanmask, currentday_ind, method=interpolation_method)
+                
+                # Count NaN after temporal interpolation (inside ROI)
+                if save_pixel_counters:
+                    nan_after_temporal = count_nan_in_roi(current_view, nanmask)
+            
+            # Clip the current day to the valid NDSI range [0, 100] in place
+            # (NaN stays NaN) and set all pixels below 1000m elevation to 0
+            # (no snow), in one pass; the rest of the window is not emitted.
+            # Snow is unlikely at low elevations, matching local processor behavior
+            ndsi_final = current_view
+            clip_and_zero_2d(ndsi_final, low_elevation_mask, 0.0, 100.0)
+            
+            # Store result
+            np.copyto(out_arr[:, :, i - daysbefore], ndsi_final, casting='unsafe')
+            
+            # Store counters for this date (only if enabled)
+            if save_pixel_counters:
+                # Original NaN pixels INSIDE ROI (before spatial correction),
+                # accumulated per row by process_one_day
+                original_nan_inside_roi = row_nan_counts.sum()
+                temporal_filled = nan_before_temporal - nan_after_temporal
+                
+                counters['original_nan_count'].append(int(original_nan_inside_roi))
+                counters['spatial_filled_count'].append(int(spatial_filled))
+                counters['temporal_filled_count'].append(int(temporal_filled))
+    finally:
+        for window in (window_mod, window_myd, window_mod_class, window_myd_class):
+            if window is not None:
+                release_buffer(window)
+        for reader in readers:
+            reader.close()
+    
+    # Every iteration emits its day, so the output dates (and the counter
+    # date strings, formatted in one vectorized call) follow the loop range
+    processed_dates = series[daysbefore:len(series) - daysafter]
+    out_dates = list(processed_dates)
+    if save_pixel_counters:
+        counters['date'] = list(processed_dates.strftime('%Y-%m-%d'))
     
     return out_arr, out_dates, counters
 
 
-# Valid output dtypes (float only, no integer types)
-VALID_OUTPUT_DTYPES = ['float16', 'float32', 'float64']
+# Valid output dtypes (floats, plus uint8 quantized storage with a fill value)
+VALID_OUTPUT_DTYPES = ['float16', 'float32', 'float64', 'uint8']
+
+# In-memory dtype of the processed array for quantized output dtypes
+_QUANTIZED_ARRAY_DTYPES = {'uint8': 'float16'}
+
+# Lookup sets for argument validation, built once at import
+_VALID_OUTPUT_DTYPES = frozenset(VALID_OUTPUT_DTYPES)
+_INVALID_INT_DTYPES = frozenset({
+    'int8', 'int16', 'int32', 'int64', 'uint16', 'uint32', 'uint64'
+})
+_VALID_INTERPOLATION_METHODS = frozenset(get_interpolation_methods())
+_VALID_SPATIAL_METHODS = frozenset({"new", "old", "none", "elevation_mean", "neighbor_based"})
+
+
+def _validate_choice(value: str, valid: frozenset, name: str) -> None:
+    """
+    Validate a case-insensitive string option against a set of choices.
+    
+    Parameters
+    ----------
+    value : str
+        Option given by the caller.
+    valid : frozenset
+        Accepted lowercase values.
+    name : str
+        Argument name used in the error message.
+        
+    Raises
+    ------
+    ValueError
+        If ``value.lower()`` is not in ``valid``.
+    """
+    if value.lower() not in valid:
+        raise ValueError(
+            f"Invalid {name} '{value}'. "
+            f"Must be one of: {sorted(valid)}"
+        )
 
 
 def _validate_output_dtype(dtype: str) -> str:
@@ -411,23 +593,23 @@ def _validate_output_dtype(dtype: str) -> str:
     Raises
     ------
     ValueError
-        If dtype is invalid (integer types or unsupported float types).
+        If dtype is invalid (integer types other than uint8, or unsupported
+        float types).
     """
     dtype_lower = dtype.lower().strip()
     
-    # Check for integer types and reject them
-    integer_types = ['int8', 'int16', 'int32', 'int64', 'uint8', 'uint16', 'uint32', 'uint64']
-    if dtype_lower in integer_types:
+    # Reject integer types
+    if dtype_lower in _INVALID_INT_DTYPES:
         raise ValueError(
-            f"Invalid output_dtype '{dtype}'. Integer types are not supported because:\n"
+            f"Invalid output_dtype '{dtype}'. Integer types other than 'uint8' are not supported because:\n"
             f"  - NDSI data requires NaN representation for missing values\n"
             f"  - Integer types cannot represent NaN\n"
             f"  - Minimum supported dtype is 'float16' (sufficient for NDSI range 0-100)\n"
             f"\nValid options: {', '.join(VALID_OUTPUT_DTYPES)}"
         )
     
-    # Check for valid float types
-    if dtype_lower not in VALID_OUTPUT_DTYPES:
+    # Check for valid types
+    if dtype_lower not in _VALID_OUTPUT_DTYPES:
         raise ValueError(
             f"Invalid output_dtype '{dtype}'.\n"
             f"Valid options: {', '.join(VALID_OUTPUT_DTYPES)}\n"
@@ -439,9 +621,9 @@ def _validate_output_dtype(dtype: str) -> str:
 
 def modis_time_series_cloud(
     mod_ds: xr.Dataset,
-    myd_ds: xr.Dataset,
+    myd_ds: Optional[xr.Dataset],
     mod_class_ds: xr.Dataset,
-    myd_class_ds: xr.Dataset,
+    myd_class_ds: Optional[xr.Dataset],
     dem_ds: xr.Dataset,
     output_zarr: str,
     file_name: str,
@@ -453,7 +635,8 @@ def modis_time_series_cloud(
     verbose: bool = True,
     save_pixel_counters: bool = False,
     output_dtype: str = 'float16',
-    target_crs: str = None
+    target_crs: str = None,
+    use_memmap: bool = False
 ) -> Tuple[xr.Dataset, dict]:
     """
     Process MODIS time series and save to Zarr format.
@@ -475,12 +658,14 @@ def modis_time_series_cloud(
     ----------
     mod_ds : xr.Dataset
         Terra (MOD10A1) NDSI dataset (can be Dask-backed).
-    myd_ds : xr.Dataset
-        Aqua (MYD10A1) NDSI dataset (can be Dask-backed).
+    myd_ds : xr.Dataset or None
+        Aqua (MYD10A1) NDSI dataset (can be Dask-backed). None when Aqua
+        is not available for the date range (Terra only).
     mod_class_ds : xr.Dataset
         Terra quality class dataset (can be Dask-backed).
-    myd_class_ds : xr.Dataset
-        Aqua quality class dataset (can be Dask-backed).
+    myd_class_ds : xr.Dataset or None
+        Aqua quality class dataset (can be Dask-backed). None together
+        with ``myd_ds``.
     dem_ds : xr.Dataset
         Digital Elevation Model dataset (can be Dask-backed).
     output_zarr : str
@@ -509,305 +694,389 @@ def modis_time_series_cloud(
         Save pixel counters to CSV. Default False.
     output_dtype : str
         Output data type: 'float16' (default, 50% memory savings), 
-        'float32', or 'float64'.
+        'float32', 'float64', or 'uint8'. With 'uint8' the Zarr store holds
+        values rounded to integers with NaN stored as fill value 255; the
+        returned dataset stays in float16.
+    use_memmap : bool
+        Back the processed time series with a temporary memory-mapped file
+        instead of RAM, for series larger than memory. Default False.
         
     Returns
     -------
     Tuple[xr.Dataset, dict]
         Processed NDSI dataset and counters dictionary.
     """
-    import gc
-    
-    # Validate output dtype (rejects integer types)
-    output_dtype = _validate_output_dtype(output_dtype)
-    
-    # Validate interpolation method
-    valid_methods = get_interpolation_methods()
-    if interpolation_method.lower() not in valid_methods:
-        raise ValueError(
-            f"Invalid interpolation_method '{interpolation_method}'. "
-            f"Must be one of: {valid_methods}"
+    # Informational console output follows this call's verbose flag;
+    # the previous setting is restored on exit
+    previous_verbose = set_verbose(verbose)
+    try:
+        # Validate output dtype (rejects integer types)
+        output_dtype = _validate_output_dtype(output_dtype)
+        
+        # Validate interpolation and spatial correction methods
+        _validate_choice(interpolation_method, _VALID_INTERPOLATION_METHODS, 'interpolation_method')
+        _validate_choice(spatial_correction_method, _VALID_SPATIAL_METHODS, 'spatial_correction_method')
+        
+        # Moving window parameters (fixed as per algorithm requirements)
+        # 6-day window: 3 days before + current day + 2 days after
+        daysbefore = 3
+        daysafter = 2
+        
+        # Prepare DEM and nanmask
+        dem, nanmask = _prepare_dem_data(dem_ds)
+        
+        # Default: assume Aqua is available (will be overwritten if not)
+        aqua_available = True
+        
+        # Transpose datasets for cloud data (lat, lon, time)
+        if source == 'cloud':
+            mod_ds = mod_ds.transpose('lat', 'lon', 'time')
+            mod_class_ds = mod_class_ds.transpose('lat', 'lon', 'time')
+            
+            # Handle case where Aqua data is not available (dates before July 2002)
+            if myd_ds is not None:
+                myd_ds = myd_ds.transpose('lat', 'lon', 'time')
+                myd_class_ds = myd_class_ds.transpose('lat', 'lon', 'time')
+                aqua_available = True
+            else:
+                # No Aqua arrays are created: process_files_array treats None as
+                # an all-NaN sensor and uses only Terra
+                if verbose:
+                    print_warning("Aqua data not available for this date range - using Terra only")
+                myd_class_ds = None
+                aqua_available = False
+        
+        # Validate data
+        if var_name not in mod_ds:
+            raise ValueError(f"Terra dataset does not contain variable '{var_name}'.")
+        if myd_ds is not None:
+            if var_name not in myd_ds:
+                raise ValueError(f"Aqua dataset does not contain variable '{var_name}'.")
+            
+            mod_shape = mod_ds[var_name].shape
+            myd_shape = myd_ds[var_name].shape
+            
+            if mod_shape[:2] != myd_shape[:2]:
+                raise ValueError(
+                    f"Terra and Aqua spatial dimensions do not match: "
+                    f"Terra {mod_shape[:2]} vs Aqua {myd_shape[:2]}"
+                )
+        
+        # Generate time series
+        series, movwind, currentday_ind = generate_time_series(
+            mod_ds['time'].values, daysbefore, daysafter
         )
-    
-    # Validate spatial correction method
-    valid_spatial = ["new", "old", "none", "elevation_mean", "neighbor_based"]
-    if spatial_correction_method.lower() not in valid_spatial:
-        raise ValueError(
-            f"Invalid spatial_correction_method '{spatial_correction_method}'. "
-            f"Must be one of: {valid_spatial}"
+        
+        # Process time series
+        if verbose:
+            print_info("Applying spatio-temporal gap-filling algorithm...")
+        
+        out_arr, out_dates, counters = process_files_array(
+            series, movwind, currentday_ind,
+            mod_ds, myd_ds, mod_class_ds, myd_class_ds,
+            dem, nanmask, daysbefore, daysafter, var_name,
+            interpolation_method=interpolation_method,
+            spatial_correction_method=spatial_correction_method,
+            verbose=verbose,
+            save_pixel_counters=save_pixel_counters,
+            output_dtype=_QUANTIZED_ARRAY_DTYPES.get(output_dtype, output_dtype),
+            use_memmap=use_memmap
         )
-    
-    # Moving window parameters (fixed as per algorithm requirements)
-    # 6-day window: 3 days before + current day + 2 days after
-    daysbefore = 3
-    daysafter = 2
-    
-    # Prepare DEM and nanmask
-    dem, nanmask = _prepare_dem_data(dem_ds)
-    
-    # Default: assume Aqua is available (will be overwritten if not)
-    aqua_available = True
-    
-    # Transpose datasets for cloud data (lat, lon, time)
-    if source == 'cloud':
-        mod_ds = mod_ds.transpose('lat', 'lon', 'time')
-        mod_class_ds = mod_class_ds.transpose('lat', 'lon', 'time')
         
-        # Handle case where Aqua data is not available (dates before July 2002)
-        if myd_ds is not None:
-            myd_ds = myd_ds.transpose('lat', 'lon', 'time')
-            myd_class_ds = myd_class_ds.transpose('lat', 'lon', 'time')
-            aqua_available = True
+        # Memory cleanup: free input datasets after processing
+        # Keep only lat/lon coords needed for output
+        lat_coords = mod_ds["lat"].values.copy()
+        lon_coords = mod_ds["lon"].values.copy()
+        del mod_ds, myd_ds, mod_class_ds, myd_class_ds, dem, nanmask
+        
+        # Create professional metadata structure for scientific publications
+        from pyproj import CRS
+        
+        processing_timestamp = datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%SZ')
+        
+        # Parse CRS for dynamic coordinate attribute generation
+        crs_obj = CRS.from_user_input(target_crs) if target_crs else CRS.from_epsg(4326)
+        
+        # Determine coordinate attributes based on CRS type
+        if crs_obj.is_geographic:
+            # Geographic CRS (e.g., WGS84, NAD83)
+            x_standard_name = "longitude"
+            y_standard_name = "latitude"
+            x_units = "degrees_east"
+            y_units = "degrees_north"
+            x_long_name = "longitude"
+            y_long_name = "latitude"
+            geospatial_x_units = "degrees_east"
+            geospatial_y_units = "degrees_north"
         else:
-            # Create empty Aqua datasets matching Terra structure
-            # This allows the algorithm to proceed unchanged - it will simply
-            # not find any valid Aqua data and use only Terra
-            if verbose:
-                print_warning("Aqua data not available for this date range - using Terra only")
-            myd_ds = mod_ds.copy(deep=False)
-            myd_ds[var_name] = xr.full_like(mod_ds[var_name], np.nan)
-            myd_class_ds = mod_class_ds.copy(deep=False)
-            myd_class_ds['NDSI_Snow_Cover_Class'] = xr.full_like(
-                mod_class_ds['NDSI_Snow_Cover_Class'], np.nan
-            )
-            aqua_available = False
-    
-    # Validate data
-    if var_name not in mod_ds:
-        raise ValueError(f"Terra dataset does not contain variable '{var_name}'.")
-    if var_name not in myd_ds:
-        raise ValueError(f"Aqua dataset does not contain variable '{var_name}'.")
-    
-    mod_shape = mod_ds[var_name].values.shape
-    myd_shape = myd_ds[var_name].values.shape
-    
-    if mod_shape[:2] != myd_shape[:2]:
-        raise ValueError(
-            f"Terra and Aqua spatial dimensions do not match: "
-            f"Terra {mod_shape[:2]} vs Aqua {myd_shape[:2]}"
+            # Projected CRS (e.g., UTM, Lambert)
+            x_standard_name = "projection_x_coordinate"
+            y_standard_name = "projection_y_coordinate"
+            # Dynamically get linear units from CRS (usually 'm', but could be 'US survey foot')
+            linear_unit = crs_obj.axis_info[0].unit_name if crs_obj.axis_info else "m"
+            x_units = linear_unit
+            y_units = linear_unit
+            x_long_name = "x coordinate of projection"
+            y_long_name = "y coordinate of projection"
+            geospatial_x_units = linear_unit
+            geospatial_y_units = linear_unit
+        
+        # Global dataset attributes (CF-compliant and ACDD-compliant)
+        # Adjust description based on whether Aqua data was available
+        if aqua_available:
+            data_source_summary = ("Daily gap-filled Normalized Difference Snow Index (NDSI) snow cover "
+                                  "derived from MODIS Terra (MOD10A1) and Aqua (MYD10A1) sensors using "
+                                  "SnowMapPy's 6-day moving window algorithm with Terra/Aqua fusion.")
+            data_source = "MODIS/061/MOD10A1 (Terra), MODIS/061/MYD10A1 (Aqua) via Google Earth Engine"
+            platform_info = "Terra, Aqua"
+        else:
+            data_source_summary = ("Daily gap-filled Normalized Difference Snow Index (NDSI) snow cover "
+                                  "derived from MODIS Terra (MOD10A1) sensor using "
+                                  "SnowMapPy's 6-day moving window algorithm (Terra only, Aqua not available for date range).")
+            data_source = "MODIS/061/MOD10A1 (Terra) via Google Earth Engine"
+            platform_info = "Terra"
+        
+        global_attrs = {
+            # === Identification ===
+            "title": "MODIS NDSI Snow Cover - Gap-Filled Time Series",
+            "summary": data_source_summary,
+            "keywords": "NDSI, snow cover, MODIS, Terra, Aqua, gap-filling, cryosphere, remote sensing",
+            "id": file_name,
+            
+            # === Data Source ===
+            "source": data_source,
+            "platform": platform_info,
+            "sensor": "MODIS (Moderate Resolution Imaging Spectroradiometer)",
+            "product_version": "Collection 6.1",
+            
+            # === Processing Information ===
+            "processing_level": "Level 3 (Gap-filled)",
+            "processing_software": "SnowMapPy v0.0.1",
+            "processing_software_url": "https://github.com/haytamelyo/SnowMapPy",
+            "processing_method": "6-day moving window gap-filling (3 days before, current day, 2 days after)",
+            "interpolation_method": interpolation_method,
+            "spatial_correction_method": spatial_correction_method,
+            "date_created": processing_timestamp,
+            
+            # === Spatial Information ===
+            "geospatial_lat_min": float(np.nanmin(lat_coords)),
+            "geospatial_lat_max": float(np.nanmax(lat_coords)),
+            "geospatial_lon_min": float(np.nanmin(lon_coords)),
+            "geospatial_lon_max": float(np.nanmax(lon_coords)),
+            "geospatial_lat_units": geospatial_y_units,
+            "geospatial_lon_units": geospatial_x_units,
+            "crs": target_crs if target_crs else "EPSG:4326",
+            "crs_wkt": crs_obj.to_wkt(),
+            "spatial_resolution": "500m (MODIS native)",
+            
+            # === Temporal Information ===
+            "time_coverage_start": out_dates[0].strftime('%Y-%m-%dT00:00:00Z'),
+            "time_coverage_end": out_dates[-1].strftime('%Y-%m-%dT00:00:00Z'),
+            "time_coverage_duration": f"P{len(out_dates)}D",
+            "time_coverage_resolution": "P1D",
+            
+            # === Data Quality ===
+            "quality_control": ("Invalid MODIS classes (cloud=50, lake ice=37, inland water=39, ocean=255) "
+                              "masked prior to processing. Elevation mask applied below 1000m."),
+            "elevation_threshold": "1000m (pixels below set to 0 NDSI)",
+            "moving_window_days_before": daysbefore,
+            "moving_window_days_after": daysafter,
+            
+            # === Technical Specifications ===
+            "output_dtype": output_dtype,
+            "compression": "Blosc ZSTD level 1 with bit-shuffle",
+            "storage_format": "Zarr v3",
+            
+            # === Attribution ===
+            "creator_name": "SnowMapPy Development Team",
+            "creator_url": "https://github.com/haytamelyo/SnowMapPy",
+            "references": ("Elyoussfi, H., Bechri, H., & Bousbaa, M. (2025). SnowMapPy: A Python package "
+                          "for MODIS snow cover gap-filling."),
+            "license": "MIT License"
+        }
+        
+        # Variable-specific attributes (CF-compliant)
+        var_attrs = {
+            "long_name": "MODIS/Terra+Aqua Normalized Difference Snow Index (NDSI) Snow Cover",
+            "standard_name": "surface_snow_area_fraction",
+            "units": "percent",
+            "valid_min": 0,
+            "valid_max": 100,
+            "scale_factor": 1.0,
+            "add_offset": 0.0,
+            "grid_mapping": "spatial_ref",
+            "_FillValue": np.nan,
+            "coverage_content_type": "physicalMeasurement",
+            "comment": ("Snow cover probability (0-100%) derived from the NDSI. "
+                       "Processed via spatial-temporal gap-filling fusion.")
+        }
+        
+        # Coordinate attributes (dynamically generated based on CRS)
+        lat_attrs = {
+            "long_name": y_long_name,
+            "standard_name": y_standard_name,
+            "units": y_units,
+            "axis": "Y"
+        }
+        
+        lon_attrs = {
+            "long_name": x_long_name,
+            "standard_name": x_standard_name,
+            "units": x_units,
+            "axis": "X"
+        }
+        
+        time_attrs = {
+            "long_name": "time",
+            "standard_name": "time",
+            "axis": "T"
+            # Note: 'calendar' is automatically set by xarray during CF encoding
+        }
+        
+        # Create output dataset with full metadata
+        ds_out = xr.Dataset(
+            {
+                var_name: (("lat", "lon", "time"), out_arr, var_attrs)
+            },
+            coords={
+                "lat": ("lat", lat_coords, lat_attrs),
+                "lon": ("lon", lon_coords, lon_attrs),
+                "time": ("time", out_dates, time_attrs)
+            },
+            attrs=global_attrs
         )
-    
-    # Generate time series
-    series, movwind, currentday_ind = generate_time_series(
-        mod_ds['time'].values, daysbefore, daysafter
-    )
-    
-    # Standardize time format for efficient lookup
-    mod_ds['time'] = mod_ds['time'].dt.strftime('%Y-%m-%d')
-    myd_ds['time'] = myd_ds['time'].dt.strftime('%Y-%m-%d')
-    mod_class_ds['time'] = mod_class_ds['time'].dt.strftime('%Y-%m-%d')
-    myd_class_ds['time'] = myd_class_ds['time'].dt.strftime('%Y-%m-%d')
-    
-    # Process time series
-    if verbose:
-        print_info("Applying spatio-temporal gap-filling algorithm...")
-    
-    out_arr, out_dates, counters = process_files_array(
-        series, movwind, currentday_ind,
-        mod_ds, myd_ds, mod_class_ds, myd_class_ds,
-        dem, nanmask, daysbefore, daysafter, var_name,
-        interpolation_method=interpolation_method,
-        spatial_correction_method=spatial_correction_method,
-        verbose=verbose,
-        save_pixel_counters=save_pixel_counters
-    )
-    
-    # Memory cleanup: free input datasets after processing
-    # Keep only lat/lon coords needed for output
-    lat_coords = mod_ds["lat"].values.copy()
-    lon_coords = mod_ds["lon"].values.copy()
-    del mod_ds, myd_ds, mod_class_ds, myd_class_ds, dem, nanmask
-    gc.collect()
-    
-    # Create professional metadata structure for scientific publications
-    from datetime import datetime
-    from pyproj import CRS
-    
-    processing_timestamp = datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%SZ')
-    
-    # Parse CRS for dynamic coordinate attribute generation
-    crs_obj = CRS.from_user_input(target_crs) if target_crs else CRS.from_epsg(4326)
-    
-    # Determine coordinate attributes based on CRS type
-    if crs_obj.is_geographic:
-        # Geographic CRS (e.g., WGS84, NAD83)
-        x_standard_name = "longitude"
-        y_standard_name = "latitude"
-        x_units = "degrees_east"
-        y_units = "degrees_north"
-        x_long_name = "longitude"
-        y_long_name = "latitude"
-        geospatial_x_units = "degrees_east"
-        geospatial_y_units = "degrees_north"
-    else:
-        # Projected CRS (e.g., UTM, Lambert)
-        x_standard_name = "projection_x_coordinate"
-        y_standard_name = "projection_y_coordinate"
-        # Dynamically get linear units from CRS (usually 'm', but could be 'US survey foot')
-        linear_unit = crs_obj.axis_info[0].unit_name if crs_obj.axis_info else "m"
-        x_units = linear_unit
-        y_units = linear_unit
-        x_long_name = "x coordinate of projection"
-        y_long_name = "y coordinate of projection"
-        geospatial_x_units = linear_unit
-        geospatial_y_units = linear_unit
-    
-    # Global dataset attributes (CF-compliant and ACDD-compliant)
-    # Adjust description based on whether Aqua data was available
-    if aqua_available:
-        data_source_summary = ("Daily gap-filled Normalized Difference Snow Index (NDSI) snow cover "
-                              "derived from MODIS Terra (MOD10A1) and Aqua (MYD10A1) sensors using "
-                              "SnowMapPy's 6-day moving window algorithm with Terra/Aqua fusion.")
-        data_source = "MODIS/061/MOD10A1 (Terra), MODIS/061/MYD10A1 (Aqua) via Google Earth Engine"
-        platform_info = "Terra, Aqua"
-    else:
-        data_source_summary = ("Daily gap-filled Normalized Difference Snow Index (NDSI) snow cover "
-                              "derived from MODIS Terra (MOD10A1) sensor using "
-                              "SnowMapPy's 6-day moving window algorithm (Terra only, Aqua not available for date range).")
-        data_source = "MODIS/061/MOD10A1 (Terra) via Google Earth Engine"
-        platform_info = "Terra"
-    
-    global_attrs = {
-        # === Identification ===
-        "title": "MODIS NDSI Snow Cover - Gap-Filled Time Series",
-        "summary": data_source_summary,
-        "keywords": "NDSI, snow cover, MODIS, Terra, Aqua, gap-filling, cryosphere, remote sensing",
-        "id": file_name,
         
-        # === Data Source ===
-        "source": data_source,
-        "platform": platform_info,
-        "sensor": "MODIS (Moderate Resolution Imaging Spectroradiometer)",
-        "product_version": "Collection 6.1",
+        # Write CRS using rioxarray for proper geospatial compatibility
+        if target_crs:
+            ds_out = ds_out.rio.write_crs(target_crs)
+            ds_out = ds_out.rio.set_spatial_dims(x_dim="lon", y_dim="lat")
         
-        # === Processing Information ===
-        "processing_level": "Level 3 (Gap-filled)",
-        "processing_software": "SnowMapPy v0.0.1",
-        "processing_software_url": "https://github.com/haytamelyo/SnowMapPy",
-        "processing_method": "6-day moving window gap-filling (3 days before, current day, 2 days after)",
-        "interpolation_method": interpolation_method,
-        "spatial_correction_method": spatial_correction_method,
-        "date_created": processing_timestamp,
+        # Free the large output array (data is now in ds_out). It is already in
+        # output_dtype (uint8 is quantized per chunk while writing), so
+        # save_as_zarr writes it without a second cast buffer.
+        del out_arr
         
-        # === Spatial Information ===
-        "geospatial_lat_min": float(np.nanmin(lat_coords)),
-        "geospatial_lat_max": float(np.nanmax(lat_coords)),
-        "geospatial_lon_min": float(np.nanmin(lon_coords)),
-        "geospatial_lon_max": float(np.nanmax(lon_coords)),
-        "geospatial_lat_units": geospatial_y_units,
-        "geospatial_lon_units": geospatial_x_units,
-        "crs": target_crs if target_crs else "EPSG:4326",
-        "crs_wkt": crs_obj.to_wkt(),
-        "spatial_resolution": "500m (MODIS native)",
+        # Save to Zarr with optimized compression
+        if verbose:
+            print_info("Saving to %s.zarr...", file_name)
         
-        # === Temporal Information ===
-        "time_coverage_start": out_dates[0].strftime('%Y-%m-%dT00:00:00Z'),
-        "time_coverage_end": out_dates[-1].strftime('%Y-%m-%dT00:00:00Z'),
-        "time_coverage_duration": f"P{len(out_dates)}D",
-        "time_coverage_resolution": "P1D",
+        save_as_zarr(ds_out, output_zarr, file_name, dtype=output_dtype, compressor=NDSI_COMPRESSOR)
         
-        # === Data Quality ===
-        "quality_control": ("Invalid MODIS classes (cloud=50, lake ice=37, inland water=39, ocean=255) "
-                          "masked prior to processing. Elevation mask applied below 1000m."),
-        "elevation_threshold": "1000m (pixels below set to 0 NDSI)",
-        "moving_window_days_before": daysbefore,
-        "moving_window_days_after": daysafter,
+        # Memory cleanup
+        gc.collect()
         
-        # === Technical Specifications ===
-        "output_dtype": output_dtype,
-        "compression": "ZSTD level 3",
-        "storage_format": "Zarr v3",
+        # Save counters to CSV if requested
+        if save_pixel_counters and counters:
+            counters_csv_path = os.path.join(output_zarr, f"{file_name}_pixel_counters.csv")
+            _write_counters_csv(counters, counters_csv_path)
+            
+            if verbose:
+                print_success("Pixel counters saved")
         
-        # === Attribution ===
-        "creator_name": "SnowMapPy Development Team",
-        "creator_url": "https://github.com/haytamelyo/SnowMapPy",
-        "references": ("Elyoussfi, H., Bechri, H., & Bousbaa, M. (2025). SnowMapPy: A Python package "
-                      "for MODIS snow cover gap-filling."),
-        "license": "MIT License"
-    }
-    
-    # Variable-specific attributes (CF-compliant)
-    var_attrs = {
-        "long_name": "MODIS/Terra+Aqua Normalized Difference Snow Index (NDSI) Snow Cover",
-        "standard_name": "surface_snow_area_fraction",
-        "units": "percent",
-        "valid_min": 0,
-        "valid_max": 100,
-        "scale_factor": 1.0,
-        "add_offset": 0.0,
-        "grid_mapping": "spatial_ref",
-        "_FillValue": np.nan,
-        "coverage_content_type": "physicalMeasurement",
-        "comment": ("Snow cover probability (0-100%) derived from the NDSI. "
-                   "Processed via spatial-temporal gap-filling fusion.")
-    }
-    
-    # Coordinate attributes (dynamically generated based on CRS)
-    lat_attrs = {
-        "long_name": y_long_name,
-        "standard_name": y_standard_name,
-        "units": y_units,
-        "axis": "Y"
-    }
-    
-    lon_attrs = {
-        "long_name": x_long_name,
-        "standard_name": x_standard_name,
-        "units": x_units,
-        "axis": "X"
-    }
-    
-    time_attrs = {
-        "long_name": "time",
-        "standard_name": "time",
-        "axis": "T"
-        # Note: 'calendar' is automatically set by xarray during CF encoding
-    }
-    
-    # Create output dataset with full metadata
-    ds_out = xr.Dataset(
-        {
-            var_name: (("lat", "lon", "time"), out_arr, var_attrs)
-        },
-        coords={
-            "lat": ("lat", lat_coords, lat_attrs),
-            "lon": ("lon", lon_coords, lon_attrs),
-            "time": ("time", out_dates, time_attrs)
-        },
-        attrs=global_attrs
-    )
-    
-    # Write CRS using rioxarray for proper geospatial compatibility
-    if target_crs:
-        ds_out = ds_out.rio.write_crs(target_crs)
-        ds_out = ds_out.rio.set_spatial_dims(x_dim="lon", y_dim="lat")
-    
-    # Free the large output array (data is now in ds_out)
-    del out_arr
-    gc.collect()
+        if verbose:
+            print_success("Processing complete!")
+        
+        return ds_out, counters
+    finally:
+        set_verbose(previous_verbose)
+
+
+def _divisor_time_chunk(source_time_chunk: Optional[int], max_chunk: int = 64) -> Optional[int]:
+    """
+    Largest divisor of a source time chunk that is at most ``max_chunk``.
     
-    # Save to Zarr with optimized compression
-    if verbose:
-        print_info(f"Saving to {file_name}.zarr...")
+    Output chunks of that size never straddle source chunks. Returns None
+    (use the default) when there is no source chunk, and ``max_chunk``
+    when the only such divisors are too small to be useful (e.g. a prime
+    source chunk), accepting some realignment over tiny time chunks.
+    """
+    if not source_time_chunk:
+        return None
+    if source_time_chunk <= max_chunk:
+        return source_time_chunk
+    divisor = next(d for d in range(max_chunk, 0, -1) if source_time_chunk % d == 0)
+    return divisor if divisor >= max_chunk // 8 else max_chunk
+
+
+def _has_dim_order(ds: xr.Dataset, order: Tuple[str, ...]) -> bool:
+    """Return True if every data variable of ``ds`` has exactly the dimensions ``order``."""
+    # Plain tuple compares on the underlying Variables; ds[var] would build
+    # a full DataArray (with coordinates) just to read its dims
+    variables = ds.variables
+    return all(variables[var].dims == order for var in ds.data_vars)
+
+
+def _write_counters_csv(counters: dict, path: str) -> None:
+    """
+    Write the pixel counters dictionary (column name -> list) to CSV.
     
-    save_as_zarr(ds_out, output_zarr, file_name, dtype=output_dtype)
+    Uses pyarrow's vectorized CSV writer when installed, otherwise the
+    standard library csv module. Both produce an unquoted header row
+    followed by one row per date, without building a pandas DataFrame.
     
-    # Memory cleanup
-    gc.collect()
+    Parameters
+    ----------
+    counters : dict
+        Counters returned by ``process_files_array``.
+    path : str
+        Destination CSV file.
+    """
+    if PYARROW_AVAILABLE:
+        with open(path, "wb") as f:
+            # Header written here: older pyarrow versions always quote it
+            f.write((",".join(counters) + "\n").encode())
+            pacsv.write_csv(
+                pa.table(counters), f,
+                write_options=pacsv.WriteOptions(include_header=False, quoting_style="none")
+            )
+        return
     
-    # Save counters to CSV if requested
-    if save_pixel_counters and counters:
-        counters_df = pd.DataFrame(counters)
-        counters_csv_path = os.path.join(output_zarr, f"{file_name}_pixel_counters.csv")
-        counters_df.to_csv(counters_csv_path, index=False)
-        
-        if verbose:
-            print_success(f"Pixel counters saved")
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(counters.keys())
+        writer.writerows(zip(*counters.values()))
+
+
+def _write_zarr_chunked(
+    ds: xr.Dataset,
+    path: str,
+    chunks: dict,
+    group: Optional[str] = None,
+    compute: bool = True
+):
+    """
+    Rechunk a dataset and stream it to a Zarr store with matching chunks.
     
-    if verbose:
-        print_success("Processing complete!")
+    Parameters
+    ----------
+    ds : xr.Dataset
+        Dataset to write (can be Dask-backed).
+    path : str
+        Destination Zarr store, overwritten if it exists.
+    chunks : dict
+        Chunk size per dimension name, e.g. ``{'lat': 256, 'lon': 256, 'time': 64}``.
+        Used both for the Dask chunks and the on-disk Zarr chunks.
+    group : str, optional
+        Group inside the store to write to (replaced if it exists). The
+        whole store is overwritten when None. Metadata is not consolidated
+        here; call ``zarr.consolidate_metadata`` once on the store.
+    compute : bool
+        If False, only the store metadata is written and a delayed object
+        performing the data write is returned (see ``xr.Dataset.to_zarr``).
     
-    return ds_out, counters
+    Returns
+    -------
+    dask.delayed.Delayed or xarray ZarrStore
+        Result of ``to_zarr``.
+    """
+    encoding = {
+        var: {'chunks': tuple(chunks[dim] for dim in ds[var].dims)}
+        for var in ds.data_vars
+        if all(dim in chunks for dim in ds[var].dims)
+    }
+    return ds.chunk(chunks).to_zarr(
+        path, group=group, mode="w", encoding=encoding, compute=compute, consolidated=False
+    )
 
 
 def process_modis_ndsi_cloud(
@@ -826,7 +1095,8 @@ def process_modis_ndsi_cloud(
     spatial_correction_method: SpatialCorrectionMethod = "old",
     save_pixel_counters: bool = False,
     verbose: bool = True,
-    output_dtype: str = 'float16'
+    output_dtype: str = 'float16',
+    use_memmap: bool = False
 ) -> Tuple[xr.Dataset, dict]:
     """
     Complete cloud processing pipeline for MODIS NDSI data from Google Earth Engine.
@@ -872,12 +1142,14 @@ def process_modis_ndsi_cloud(
     save_original_data : bool
         Save original Terra/Aqua data before processing.
         With Dask lazy loading, this streams to disk without holding in RAM.
+        All original datasets are written as groups of a single Zarr store,
+        '<file_name>_originals.zarr', with consolidated metadata.
     terra_file_name : str
-        Name for Terra data file if saving.
+        Group name for Terra data if saving (class data: '<name>_class').
     aqua_file_name : str
-        Name for Aqua data file if saving.
+        Group name for Aqua data if saving (class data: '<name>_class').
     dem_file_name : str
-        Name for DEM file if saving.
+        Group name for the DEM if saving.
     interpolation_method : str
         Temporal interpolation method:
         - "nearest": Forward/backward fill (fastest)
@@ -894,8 +1166,12 @@ def process_modis_ndsi_cloud(
         Print progress messages.
     output_dtype : str
         Output data type: 'float16' (default, 50% memory savings), 
-        'float32', or 'float64'. Float16 preserves NaN values and is 
-        sufficient for NDSI data (0-100 range).
+        'float32', 'float64', or 'uint8'. Float16 preserves NaN values and is 
+        sufficient for NDSI data (0-100 range). 'uint8' quantizes the stored
+        values to integers (1 byte per pixel, NaN as fill value 255).
+    use_memmap : bool
+        Back the processed time series with a temporary memory-mapped file
+        instead of RAM, for series larger than memory. Default False.
         
     Returns
     -------
@@ -919,127 +1195,188 @@ def process_modis_ndsi_cloud(
     ...     output_dtype="float16"  # 50% memory savings
     ... )
     """
-    import gc
-    
-    # Validate output dtype (rejects integer types)
-    output_dtype = _validate_output_dtype(output_dtype)
-    
-    # Default file_name to shapefile name + _NDSI
-    if file_name is None:
-        shapefile_basename = os.path.splitext(os.path.basename(shapefile_path))[0]
-        file_name = f"{shapefile_basename}_NDSI"
-    
-    if verbose:
-        print_banner()
-        print_section("Processing Parameters")
-        print_config("Study area", os.path.basename(shapefile_path))
-        print_config("Date range", f"{start_date} to {end_date}")
-        print_config("Output", f"{file_name}.zarr")
-        print_config("Target CRS", crs)
-        print_config("Interpolation", interpolation_method)
-        print_config("Spatial correction", spatial_correction_method)
-        print()
-    
-    # Load data from Google Earth Engine (reprojection happens on GEE server!)
-    if verbose:
-        print_info("Preparing MODIS Terra and Aqua collections...")
-    
-    (ds_terra_value_clipped, ds_aqua_value_clipped,
-     ds_terra_class_clipped, ds_aqua_class_clipped,
-     ds_dem_clipped, roi_checker) = load_modis_cloud_data(
-        project_name, shapefile_path, start_date, end_date, crs
-    )
-    
-    # Memory cleanup after loading
-    gc.collect()
-    
-    # Standardize dimension order to (lat, lon, time) for ALL datasets
-    # GEE/xee may return projected CRS data as (time, X, Y) which becomes
-    # (time, lon, lat) after renaming. This must be standardized BEFORE
-    # saving original data so it matches the processed output dimension order.
-    spatial_dims = [d for d in ds_terra_value_clipped.dims if d != 'time']
-    if list(ds_terra_value_clipped.dims).index(spatial_dims[0]) != 0 or \
-       list(ds_terra_value_clipped.dims) != ['lat', 'lon', 'time']:
-        target_order = ('lat', 'lon', 'time')
-        ds_terra_value_clipped = ds_terra_value_clipped.transpose(*target_order)
-        ds_terra_class_clipped = ds_terra_class_clipped.transpose(*target_order)
-        # Only transpose Aqua if available
-        if ds_aqua_value_clipped is not None:
-            ds_aqua_value_clipped = ds_aqua_value_clipped.transpose(*target_order)
-            ds_aqua_class_clipped = ds_aqua_class_clipped.transpose(*target_order)
-        # DEM may have a singleton time dimension from GEE - squeeze it out first
-        if 'time' in ds_dem_clipped.dims:
-            ds_dem_clipped = ds_dem_clipped.isel(time=0, drop=True)
-        # Now transpose DEM to (lat, lon)
-        dem_dims = [d for d in ds_dem_clipped.dims if d in ('lat', 'lon')]
-        if len(dem_dims) == 2 and list(ds_dem_clipped.dims) != ['lat', 'lon']:
-            ds_dem_clipped = ds_dem_clipped.transpose('lat', 'lon')
-    
-    # Save original data if requested (streaming to Zarr)
-    if save_original_data:
+    # Informational console output follows this call's verbose flag;
+    # the previous setting is restored on exit
+    previous_verbose = set_verbose(verbose)
+    try:
+        # Validate output dtype (rejects integer types)
+        output_dtype = _validate_output_dtype(output_dtype)
+        
+        # Default file_name to shapefile name + _NDSI
+        if file_name is None:
+            shapefile_basename = os.path.splitext(os.path.basename(shapefile_path))[0]
+            file_name = f"{shapefile_basename}_NDSI"
+        
         if verbose:
-            print_info("Saving original data...")
+            print_banner()
+            print_section("Processing Parameters")
+            print_config("Study area", os.path.basename(shapefile_path))
+            print_config("Date range", f"{start_date} to {end_date}")
+            print_config("Output", f"{file_name}.zarr")
+            print_config("Target CRS", crs)
+            print_config("Interpolation", interpolation_method)
+            print_config("Spatial correction", spatial_correction_method)
+            print()
         
-        # Rechunk to Zarr-compatible chunks
-        n_lat = len(ds_terra_value_clipped.lat)
-        n_lon = len(ds_terra_value_clipped.lon)
-        n_time = len(ds_terra_value_clipped.time)
-        zarr_chunks = {'lat': n_lat, 'lon': n_lon, 'time': min(64, n_time)}
+        # Load data from Google Earth Engine (reprojection happens on GEE server!)
+        if verbose:
+            print_info("Preparing MODIS Terra and Aqua collections...")
         
-        # Stream each dataset to Zarr
-        ds_terra_value_clipped.chunk(zarr_chunks).to_zarr(
-            os.path.join(output_path, f"{terra_file_name}.zarr"), mode="w"
+        (ds_terra_value_clipped, ds_aqua_value_clipped,
+         ds_terra_class_clipped, ds_aqua_class_clipped,
+         ds_dem_clipped, roi_checker) = load_modis_cloud_data(
+            project_name, shapefile_path, start_date, end_date, crs
         )
-        gc.collect()
         
-        if ds_aqua_value_clipped is not None:
-            ds_aqua_value_clipped.chunk(zarr_chunks).to_zarr(
-                os.path.join(output_path, f"{aqua_file_name}.zarr"), mode="w"
+        # Standardize dimension order to (lat, lon, time) for ALL datasets
+        # GEE/xee may return projected CRS data as (time, X, Y) which becomes
+        # (time, lon, lat) after renaming. This must be standardized BEFORE
+        # saving original data so it matches the processed output dimension order.
+        # On Dask-backed data transpose only permutes the graph lazily (nothing is
+        # computed); the one rechunk happens later, to the Zarr write chunks.
+        target_order = ('lat', 'lon', 'time')
+        datasets = {
+            'terra_value': ds_terra_value_clipped,
+            'terra_class': ds_terra_class_clipped,
+            'aqua_value': ds_aqua_value_clipped,
+            'aqua_class': ds_aqua_class_clipped,
+        }
+        # Only datasets that are present and not already ordered are transposed
+        datasets = {
+            key: ds.transpose(*target_order) if ds is not None and not _has_dim_order(ds, target_order) else ds
+            for key, ds in datasets.items()
+        }
+        ds_terra_value_clipped = datasets['terra_value']
+        ds_terra_class_clipped = datasets['terra_class']
+        ds_aqua_value_clipped = datasets['aqua_value']
+        ds_aqua_class_clipped = datasets['aqua_class']
+        
+        # DEM may have a singleton time dimension from GEE - squeeze it out, then
+        # order it as (lat, lon)
+        if not _has_dim_order(ds_dem_clipped, ('lat', 'lon')):
+            if 'time' in ds_dem_clipped.dims:
+                ds_dem_clipped = ds_dem_clipped.isel(time=0, drop=True)
+            if 'lat' in ds_dem_clipped.dims and 'lon' in ds_dem_clipped.dims:
+                ds_dem_clipped = ds_dem_clipped.transpose('lat', 'lon', ...)
+        
+        # Save original data if requested (streaming to Zarr)
+        if save_original_data:
+            if verbose:
+                print_info("Saving original data...")
+            
+            # Balanced (lat, lon, time) tiles instead of one full raster per time
+            # step, so per-pixel time-series reads do not decode whole maps
+            n_lat = len(ds_terra_value_clipped.lat)
+            n_lon = len(ds_terra_value_clipped.lon)
+            n_time = len(ds_terra_value_clipped.time)
+            itemsize = ds_terra_value_clipped['NDSI_Snow_Cover'].dtype.itemsize
+            # Time chunk dividing the loader's Dask time chunk (from
+            # calculate_optimal_chunks), so that writing splits source chunks
+            # instead of shuffling them, while staying at most 64 days
+            source_chunks = ds_terra_value_clipped['NDSI_Snow_Cover'].chunksizes
+            source_time_chunk = source_chunks['time'][0] if 'time' in source_chunks else None
+            lat_chunk, lon_chunk, time_chunk = compute_balanced_chunks(
+                n_lat, n_lon, n_time, itemsize,
+                time_chunk=_divisor_time_chunk(source_time_chunk)
             )
-            gc.collect()
+            zarr_chunks = {'lat': lat_chunk, 'lon': lon_chunk, 'time': time_chunk}
+            
+            dem_itemsize = ds_dem_clipped['elevation'].dtype.itemsize
+            dem_lat_chunk, dem_lon_chunk, _ = compute_balanced_chunks(n_lat, n_lon, 1, dem_itemsize)
+            dem_zarr_chunks = {'lat': dem_lat_chunk, 'lon': dem_lon_chunk}
+            
+            groups = [
+                (ds_terra_value_clipped, terra_file_name, zarr_chunks),
+                (ds_aqua_value_clipped, aqua_file_name, zarr_chunks),
+                (ds_dem_clipped, dem_file_name, dem_zarr_chunks),
+                (ds_terra_class_clipped, f"{terra_file_name}_class", zarr_chunks),
+                (ds_aqua_class_clipped, f"{aqua_file_name}_class", zarr_chunks),
+            ]
+            
+            # All originals go into one Zarr hierarchy, one group per dataset;
+            # the root is recreated so stale groups from earlier runs are removed
+            originals_path = os.path.join(output_path, f"{file_name}_originals.zarr")
+            zarr.open_group(originals_path, mode="w")
+            
+            # Build all writes lazily and run them in one Dask compute, so
+            # shared upstream tasks are executed once and writes overlap
+            writes = [
+                _write_zarr_chunked(ds, originals_path, chunks, group=group, compute=False)
+                for ds, group, chunks in groups
+                if ds is not None
+            ]
+            dask.compute(*writes, optimize_graph=True)
+            
+            # Metadata of the whole hierarchy consolidated once at the root
+            zarr.consolidate_metadata(originals_path)
+            
+            if verbose:
+                print_success("Original data saved")
         
-        dem_zarr_chunks = {'lat': n_lat, 'lon': n_lon}
-        ds_dem_clipped.chunk(dem_zarr_chunks).to_zarr(
-            os.path.join(output_path, f"{dem_file_name}.zarr"), mode="w"
-        )
-        gc.collect()
+        # Process time series
+        if verbose:
+            print_info("Running time series analysis...")
         
-        ds_terra_class_clipped.chunk(zarr_chunks).to_zarr(
-            os.path.join(output_path, f"{terra_file_name}_class.zarr"), mode="w"
+        time_series, counters = modis_time_series_cloud(
+            ds_terra_value_clipped, ds_aqua_value_clipped,
+            ds_terra_class_clipped, ds_aqua_class_clipped,
+            ds_dem_clipped, output_path, file_name,
+            var_name='NDSI_Snow_Cover',
+            source='cloud',
+            interpolation_method=interpolation_method,
+            spatial_correction_method=spatial_correction_method,
+            verbose=verbose,
+            save_pixel_counters=save_pixel_counters,
+            output_dtype=output_dtype,
+            target_crs=crs,
+            use_memmap=use_memmap
         )
-        gc.collect()
         
-        if ds_aqua_class_clipped is not None:
-            ds_aqua_class_clipped.chunk(zarr_chunks).to_zarr(
-                os.path.join(output_path, f"{aqua_file_name}_class.zarr"), mode="w"
-            )
-            gc.collect()
+        # Final memory cleanup
+        gc.collect()
         
         if verbose:
-            print_success("Original data saved")
-    
-    # Process time series
-    if verbose:
-        print_info("Running time series analysis...")
+            print_complete("Processing complete!")
+        
+        return time_series, counters
+    finally:
+        set_verbose(previous_verbose)
+
+
+def _warmup_kernels() -> None:
+    """
+    Pre-compile the Numba kernels used by the processing loop.
     
-    time_series, counters = modis_time_series_cloud(
-        ds_terra_value_clipped, ds_aqua_value_clipped,
-        ds_terra_class_clipped, ds_aqua_class_clipped,
-        ds_dem_clipped, output_path, file_name,
-        var_name='NDSI_Snow_Cover',
-        source='cloud',
-        interpolation_method=interpolation_method,
-        spatial_correction_method=spatial_correction_method,
-        verbose=verbose,
-        save_pixel_counters=save_pixel_counters,
-        output_dtype=output_dtype,
-        target_crs=crs
+    Calls each kernel once on tiny arrays with the same dtypes the
+    pipeline uses, so the one-time JIT compilation (or on-disk cache
+    load) happens at import time instead of inside the first call to
+    ``modis_time_series_cloud``. Disable with ``SNOWMAPPY_WARMUP=0``.
+    """
+    window = np.zeros((2, 2, 6), dtype=np.float32)
+    day = np.zeros((2, 2), dtype=np.float32)
+    nanmask = np.zeros((2, 2), dtype=np.bool_)
+    invalid_lut = build_invalid_class_lut(get_invalid_modis_classes())
+    
+    process_one_day(
+        window.copy(), window.copy(), window.copy(), window.copy(),
+        nanmask, invalid_lut, 3,
+        np.empty_like(window), np.empty_like(day), np.zeros(2, dtype=np.int64), 100.0, 0
     )
-    
-    # Final memory cleanup
-    gc.collect()
-    
-    if verbose:
-        print_complete("Processing complete!")
-    
-    return time_series, counters
\ No newline at end of file
+    apply_spatial_snow_correction(day, day, window_size=5, min_elevation=1000.0)
+    apply_old_spatial_snow_correction(day, day, threshold_elevation=1000.0)
+    # The loop passes a strided view of the merged window
+    view = window[:, :, 3]
+    apply_spatial_snow_correction_into(day, day, view, 5, 1000.0)
+    apply_old_spatial_snow_correction_inplace(view, day, 1000.0, 100.0, 0.60)
+    for method in get_interpolation_methods():
+        interpolate_temporal_day(window, nanmask, 3, method=method)
+    count_nan_in_roi(window[:, :, 3], nanmask)
+    clip_and_zero_2d(view, nanmask, 0.0, 100.0)
+
+
+if os.environ.get('SNOWMAPPY_WARMUP', '1') == '1':
+    try:
+        _warmup_kernels()
+    except Exception:
+        # Warm-up is an optimization only; kernels still compile on first use
+        pass
@@ -36,6 +36,7 @@ from .spatial import (
 
 from .temporal import (
     interpolate_temporal,
+    interpolate_temporal_day,
     get_interpolation_methods,
     validate_interpolation_method,
     vectorized_interpolation_griddata_parallel  # Deprecated legacy function
@@ -46,7 +47,8 @@ from .quality import (
     get_valid_modis_classes,
     get_invalid_modis_classes,
     create_modis_class_mask,
-    apply_modis_quality_mask
+    apply_modis_quality_mask,
+    apply_modis_quality_mask_pair
 )
 
 from .utils import (
@@ -61,11 +63,13 @@ from .utils import (
     MODIS_AQUA_FIRST_AVAILABLE_DATE,
     prompt_user_date_adjustment,
     calculate_optimal_chunks,
+    compute_balanced_chunks,
     estimate_memory_for_processing
 )
 
 from .console import (
     suppress_warnings,
+    set_verbose,
     print_banner,
     print_section,
     print_config,
@@ -90,8 +94,14 @@ from .memory import (
     log_memory,
     estimate_array_memory_gb,
     estimate_dataset_memory,
+    force_gc,
     cleanup,
     check_memory_available,
+    allocate_cube,
+    suggest_chunks,
+    acquire_buffer,
+    release_buffer,
+    pooled_buffer,
     MemoryTracker,
     print_memory_summary
 )
@@ -116,6 +126,7 @@ __all__ = [
     
     # Temporal
     'interpolate_temporal',
+    'interpolate_temporal_day',
     'get_interpolation_methods',
     'validate_interpolation_method',
     'vectorized_interpolation_griddata_parallel',
@@ -126,6 +137,7 @@ __all__ = [
     'get_invalid_modis_classes',
     'create_modis_class_mask',
     'apply_modis_quality_mask',
+    'apply_modis_quality_mask_pair',
     
     # Utils
     'extract_date',
@@ -141,10 +153,12 @@ __all__ = [
     'prompt_user_date_adjustment',
     # Optimal chunking utilities
     'calculate_optimal_chunks',
+    'compute_balanced_chunks',
     'estimate_memory_for_processing',
     
     # Console
     'suppress_warnings',
+    'set_verbose',
     'print_banner',
     'print_section',
     'print_config',
@@ -168,8 +182,14 @@ __all__ = [
     'log_memory',
     'estimate_array_memory_gb',
     'estimate_dataset_memory',
+    'force_gc',
     'cleanup',
     'check_memory_available',
+    'allocate_cube',
+    'suggest_chunks',
+    'acquire_buffer',
+    'release_buffer',
+    'pooled_buffer',
     'MemoryTracker',
     'print_memory_summary',
 ] 
\ No newline at end of file
@@ -11,6 +11,7 @@ Version: 2.0.0
 import sys
 import os
 import warnings
+from functools import lru_cache
 
 
 # =============================================================================
@@ -24,7 +25,15 @@ def fix_proj_path():
     This is needed when PostgreSQL/PostGIS or other software installs
     a conflicting PROJ version. We force PROJ to use the Python 
     environment's proj.db instead.
+    
+    On success SNOWMAPPY_PROJ_FIXED=1 is set alongside PROJ_LIB/PROJ_DATA,
+    so child processes (e.g. Dask workers) inheriting the environment skip
+    the detection.
     """
+    # Already resolved in this process or inherited from the parent
+    if os.environ.get('SNOWMAPPY_PROJ_FIXED') == '1':
+        return True
+    
     # Find the correct proj.db from the Python environment
     try:
         import pyproj
@@ -32,6 +41,7 @@ def fix_proj_path():
         if proj_dir and os.path.exists(os.path.join(proj_dir, 'proj.db')):
             os.environ['PROJ_LIB'] = proj_dir
             os.environ['PROJ_DATA'] = proj_dir
+            os.environ['SNOWMAPPY_PROJ_FIXED'] = '1'
             return True
     except ImportError:
         pass
@@ -47,6 +57,7 @@ def fix_proj_path():
             if os.path.exists(os.path.join(path, 'proj.db')):
                 os.environ['PROJ_LIB'] = path
                 os.environ['PROJ_DATA'] = path
+                os.environ['SNOWMAPPY_PROJ_FIXED'] = '1'
                 return True
     
     return False
@@ -70,22 +81,10 @@ def suppress_warnings():
         - xarray deprecation warnings
         - Earth Engine system warnings
     """
-    # Suppress all warnings by default
-    warnings.filterwarnings('ignore')
-    
-    # Specifically suppress zarr/numcodecs warnings
-    warnings.filterwarnings('ignore', category=UserWarning, module='zarr')
-    warnings.filterwarnings('ignore', category=UserWarning, module='numcodecs')
-    warnings.filterwarnings('ignore', message='.*Numcodecs codecs are not in the Zarr.*')
-    warnings.filterwarnings('ignore', message='.*Consolidated metadata.*')
-    
-    # Suppress xee warnings
-    warnings.filterwarnings('ignore', module='xee')
-    warnings.filterwarnings('ignore', message=".*system:time_start.*")
-    
-    # Suppress deprecation warnings
-    warnings.filterwarnings('ignore', category=DeprecationWarning)
-    warnings.filterwarnings('ignore', category=FutureWarning)
+    # A single catch-all entry at the front of the filter list: it covers
+    # every category listed above and matches on the first check, instead
+    # of each warn() walking a stack of per-module and per-message filters
+    warnings.simplefilter('ignore')
     
     # Suppress GDAL/PROJ errors by redirecting stderr temporarily for GDAL
     os.environ['CPL_LOG'] = 'NUL' if os.name == 'nt' else '/dev/null'
@@ -99,25 +98,43 @@ suppress_warnings()
 # TERMINAL COLORS
 # =============================================================================
 
-class Colors:
-    """ANSI color codes for terminal output."""
+def _detect_color_support():
+    """
+    Return True if ANSI colors should be emitted on stdout.
     
-    # Check if colors are supported
-    _enabled = sys.stdout.isatty() and os.name != 'nt' or \
-               os.environ.get('TERM_PROGRAM') == 'vscode' or \
-               os.environ.get('WT_SESSION') or \
-               'ANSICON' in os.environ
+    On Windows, virtual terminal processing is only switched on (one
+    SetConsoleMode call) when stdout is an interactive console, so
+    worker processes with redirected output skip the call.
+    """
+    isatty = getattr(sys.stdout, 'isatty', None)
+    is_tty = bool(isatty and isatty())
+    
+    enabled = bool(
+        is_tty and os.name != 'nt' or
+        os.environ.get('TERM_PROGRAM') == 'vscode' or
+        os.environ.get('WT_SESSION') or
+        'ANSICON' in os.environ
+    )
     
     # Try to enable colors on Windows
-    if os.name == 'nt':
+    if os.name == 'nt' and is_tty:
         try:
             import ctypes
             kernel32 = ctypes.windll.kernel32
             kernel32.SetConsoleMode(kernel32.GetStdHandle(-11), 7)
-            _enabled = True
+            enabled = True
         except Exception:
             pass
     
+    return enabled
+
+
+class Colors:
+    """ANSI color codes for terminal output."""
+    
+    # Check if colors are supported
+    _enabled = _detect_color_support()
+    
     # Color codes
     RESET = '\033[0m' if _enabled else ''
     BOLD = '\033[1m' if _enabled else ''
@@ -134,55 +151,80 @@ class Colors:
     DIM = '\033[2m' if _enabled else ''
 
 
-def _c(text, color):
-    """Apply color to text."""
-    return f"{color}{text}{Colors.RESET}"
-
+# Each wrapper binds its color codes as defaults, so a call is a single
+# concatenation instead of an attribute lookup plus f-string formatting
 
-def white(text):
+def white(text, _pre=Colors.WHITE, _post=Colors.RESET):
     """White text."""
-    return _c(text, Colors.WHITE)
+    return _pre + str(text) + _post
 
 
-def blue(text):
+def blue(text, _pre=Colors.BLUE, _post=Colors.RESET):
     """Blue text for titles."""
-    return _c(text, Colors.BLUE)
+    return _pre + str(text) + _post
 
 
-def green(text):
+def green(text, _pre=Colors.GREEN, _post=Colors.RESET):
     """Green text for success."""
-    return _c(text, Colors.GREEN)
+    return _pre + str(text) + _post
 
 
-def red(text):
+def red(text, _pre=Colors.RED, _post=Colors.RESET):
     """Red text for errors."""
-    return _c(text, Colors.RED)
+    return _pre + str(text) + _post
 
 
-def cyan(text):
+def cyan(text, _pre=Colors.CYAN, _post=Colors.RESET):
     """Cyan text for info."""
-    return _c(text, Colors.CYAN)
+    return _pre + str(text) + _post
 
 
-def yellow(text):
+def yellow(text, _pre=Colors.YELLOW, _post=Colors.RESET):
     """Yellow text for warnings."""
-    return _c(text, Colors.YELLOW)
+    return _pre + str(text) + _post
 
 
-def bold(text):
+def bold(text, _pre=Colors.BOLD, _post=Colors.RESET):
     """Bold text."""
-    return _c(text, Colors.BOLD)
+    return _pre + str(text) + _post
 
 
-def dim(text):
+def dim(text, _pre=Colors.DIM, _post=Colors.RESET):
     """Dimmed text."""
-    return _c(text, Colors.DIM)
+    return _pre + str(text) + _post
+
+
+# Precolored message prefixes
+_SUCCESS_PREFIX = green('✓')
+_ERROR_PREFIX = red('✗')
+_WARNING_PREFIX = yellow('⚠')
+_INFO_PREFIX = cyan('→')
 
 
 # =============================================================================
 # FORMATTED OUTPUT
 # =============================================================================
 
+# Informational output switch (errors and warnings are always printed)
+_VERBOSE = True
+
+
+def set_verbose(verbose):
+    """
+    Enable or disable informational console output.
+    
+    When disabled, print_info, print_success, print_config and
+    print_section return before formatting anything. Errors and warnings
+    are always printed.
+    
+    Returns the previous setting.
+    """
+    global _VERBOSE
+    previous = _VERBOSE
+    _VERBOSE = bool(verbose)
+    return previous
+
+
 def print_header(title, char='=', width=60):
     """Print a formatted header."""
     line = char * width
@@ -193,38 +235,47 @@ def print_header(title, char='=', width=60):
 
 def print_section(title, char='-', width=40):
     """Print a section header."""
+    if not _VERBOSE:
+        return
     line = char * width
     print(f"\n{blue(title)}")
     print(f"{dim(line)}")
 
 
-def print_success(message):
-    """Print a success message."""
-    print(f"{green('✓')} {message}")
+def print_success(message, *args):
+    """Print a success message (``%``-formatted with args, only when printed)."""
+    if not _VERBOSE:
+        return
+    print(_SUCCESS_PREFIX, message % args if args else message)
 
 
 def print_error(message):
     """Print an error message."""
-    print(f"{red('✗')} {red(message)}")
+    print(_ERROR_PREFIX, red(message))
 
 
 def print_warning(message):
     """Print a warning message."""
-    print(f"{yellow('⚠')} {yellow(message)}")
+    print(_WARNING_PREFIX, yellow(message))
 
 
-def print_info(message):
-    """Print an info message."""
-    print(f"{cyan('→')} {message}")
+def print_info(message, *args):
+    """Print an info message (``%``-formatted with args, only when printed)."""
+    if not _VERBOSE:
+        return
+    print(_INFO_PREFIX, message % args if args else message)
 
 
 def print_config(label, value):
     """Print a configuration key-value pair."""
+    if not _VERBOSE:
+        return
     print(f"  {white(label + ':')} {dim(str(value))}")
 
 
-def print_banner(title=None):
-    """Print the SnowMapPy ASCII art banner."""
+@lru_cache(maxsize=1)
+def _banner_text():
+    """Build the colored banner once; later calls reuse the cached string."""
     # Built-in ASCII art banner (no external dependencies)
     ascii_banner = r"""
   ____                        __  __             ____        
@@ -234,15 +285,19 @@ def print_banner(title=None):
  |____/|_| |_|\___/ \_/\_/   |_|  |_|\__,_| .__/|_|    \__, |
                                           |_|          |___/ 
 """
-    print()
-    # Print ASCII art in cyan color
-    for line in ascii_banner.split('\n'):
-        if line.strip():  # Only print non-empty lines
-            print(cyan(line))
-    print()
-    print(f"           {dim('v2.0.0')}  {dim('|')}  {dim('MODIS Snow Cover Gap-Filling')}")
-    print(f"           {dim('https://github.com/haytamelyo/SnowMapPy')}")
-    print()
+    lines = ['']
+    # ASCII art in cyan color, non-empty lines only
+    lines.extend(cyan(line) for line in ascii_banner.split('\n') if line.strip())
+    lines.append('')
+    lines.append(f"           {dim('v2.0.0')}  {dim('|')}  {dim('MODIS Snow Cover Gap-Filling')}")
+    lines.append(f"           {dim('https://github.com/haytamelyo/SnowMapPy')}")
+    lines.append('')
+    return '\n'.join(lines)
+
+
+def print_banner(title=None):
+    """Print the SnowMapPy ASCII art banner."""
+    print(_banner_text())
 
 
 def print_complete(message=None, elapsed_seconds=None):
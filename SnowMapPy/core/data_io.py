@@ -4,7 +4,7 @@ Data I/O Operations
 
 Read and write MODIS NDSI datasets with optimized compression.
 
-Uses Zarr format with ZSTD compression for efficient storage and
+Uses Zarr format with Blosc ZSTD compression for efficient storage and
 fast random access to large snow cover datasets.
 
 Authors: Haytam Elyoussfi, Hatim Bechri
@@ -15,40 +15,100 @@ import os
 import zarr
 import json
 import time
-import tempfile
-import shutil
+import itertools
 import numpy as np
 import xarray as xr
 import geopandas as gpd
 from typing import Optional, Tuple, Dict, Any, List
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 
-from numcodecs.zarr3 import Zstd
+from zarr.codecs import BloscCodec
+from zarr.storage import MemoryStore
+
+from .utils import compute_balanced_chunks
+from .._numba_kernels import cast_float64_with_nanmask
 
 try:
-    from numcodecs import LZ4, Blosc, Zlib
+    from numcodecs import Blosc
     EXTRA_CODECS_AVAILABLE = True
 except ImportError:
     EXTRA_CODECS_AVAILABLE = False
 
-DEFAULT_COMPRESSOR = Zstd(level=3)
+# ZSTD levels are tiered: 1-3 for bulk writes (level 1 gives nearly the same
+# ratio as 3 on NDSI chunks at about twice the throughput), 5-6 balanced,
+# and 9 (the Blosc maximum) when storage size matters more than write speed
+COMPRESSION_LEVEL_TIERS = {'speed': 1, 'balanced': 3, 'size': 9}
+
+DEFAULT_COMPRESSOR = BloscCodec(cname='zstd', clevel=1, shuffle='shuffle')
+
+# NDSI is bounded to [0, 100] plus NaN: bit-shuffling groups the mostly
+# constant high bits of each element into long runs before ZSTD
+NDSI_COMPRESSOR = BloscCodec(cname='zstd', clevel=1, shuffle='bitshuffle')
 DEFAULT_CHUNKS = (128, 128, 32)
 
+# Fill value of uint8-quantized NDSI; NDSI itself only spans 0-100
+NDSI_UINT8_FILL_VALUE = 255
+
+# Uncompressed chunk size targeted by adaptive chunking: 64-128 KB working
+# sets stay L2-resident while decoding and keep sparse time reads cheap
+TARGET_CHUNK_BYTES = 128 * 1024
+
+# Chunks grouped per dimension into one Zarr v3 shard (one file per shard)
+SHARD_CHUNKS_PER_DIM = 4
+
+
+def _shard_shape(chunk_shape: Tuple[int, ...], shape: Tuple[int, ...]) -> Tuple[int, ...]:
+    """
+    Shard shape grouping up to ``SHARD_CHUNKS_PER_DIM`` chunks per dimension.
+    
+    Each shard side is a whole number of chunks (required by Zarr v3), and
+    no more chunks than the dimension needs.
+    """
+    return tuple(
+        min(SHARD_CHUNKS_PER_DIM, max(1, -(-s // c))) * c
+        for c, s in zip(chunk_shape, shape)
+    )
+
+
+def _make_compressor(level: int, dtype: Optional[Any] = None) -> BloscCodec:
+    """
+    Build the default Blosc ZSTD codec for a given level and stored dtype.
+    
+    Byte-shuffle groups the bytes of each element into planes before ZSTD,
+    and Blosc compresses blocks with multiple threads. Bit-shuffle is used
+    for 2-byte types (float16 NDSI), whose high bits repeat heavily.
+    """
+    shuffle = 'bitshuffle' if dtype is not None and np.dtype(dtype).itemsize == 2 else 'shuffle'
+    return _blosc_zstd(level, shuffle)
+
+
+@lru_cache(maxsize=None)
+def _blosc_zstd(level: int, shuffle: str) -> BloscCodec:
+    """Blosc ZSTD codec, built once per (level, shuffle); codecs are immutable."""
+    return BloscCodec(cname='zstd', clevel=level, shuffle=shuffle)
+
 
 def save_as_zarr(
     ds: xr.Dataset,
     output_folder: str,
     file_name: str,
     chunks: Optional[Tuple[int, int, int]] = None,
-    compression_level: int = 3,
+    compression_level: int = 1,
     dtype: Optional[str] = 'float16',
-    params_file: Optional[str] = None  # Kept for backward compatibility, ignored
+    params_file: Optional[str] = None,  # Kept for backward compatibility, ignored
+    compressor: Optional[Any] = None
 ) -> str:
     """
     Save xarray Dataset as optimized Zarr store.
     
-    Uses ZSTD compression which provides excellent compression ratios with
-    fast read/write speeds. The chunk size is optimized for typical MODIS
-    access patterns (spatial queries with some temporal slicing).
+    Uses Blosc-wrapped ZSTD compression with byte-shuffle (bit-shuffle for
+    float16), which provides excellent compression ratios with fast,
+    multi-threaded read/write speeds. Chunks are grouped into Zarr v3
+    shards of up to ``SHARD_CHUNKS_PER_DIM`` chunks per dimension, so the
+    store holds one file per shard while chunks stay individually
+    readable. The chunk size is optimized for typical MODIS access
+    patterns (spatial queries with some temporal slicing).
     
     MEMORY OPTIMIZATION: Set dtype='float16' (default) to reduce storage and memory by 50%.
     Float16 supports NaN values and is sufficient for NDSI data (0-100 range).
@@ -70,21 +130,27 @@ def save_as_zarr(
         Larger spatial chunks improve compression; larger time chunks
         improve time-series queries.
     compression_level : int, optional
-        ZSTD compression level (1-22). Default is 3.
+        ZSTD compression level inside Blosc (1-9). Default is 1.
         - Level 1-3: Fast compression, good for large datasets
         - Level 4-6: Balanced compression/speed
-        - Level 7+: Slower, diminishing returns on ratio
+        - Level 7-9: Slower, diminishing returns on ratio
     dtype : str, optional
         Output data type for data variables. Options: 'float16' (default),
-        'float32', 'float64'.
+        'float32', 'float64', 'uint8'.
         - 'float16': 50% memory/storage savings, preserves NaN (recommended)
         - 'float32': Standard precision
         - 'float64': Full precision
+        - 'uint8': Quantized storage, 1 byte per pixel. Values are clipped
+          to 0-100 and rounded to integers; NaN is stored as the CF
+          ``_FillValue`` 255 and restored to NaN when read with xarray.
         
-        NOTE: Integer types (int16, uint8, etc.) are NOT supported because
-        NDSI data requires NaN representation for missing values.
+        NOTE: Other integer types (int16, uint16, etc.) are NOT supported
+        because NDSI data requires NaN representation for missing values.
     params_file : str, optional
         Deprecated parameter, kept for backward compatibility. Ignored.
+    compressor : zarr codec, optional
+        Compression codec to use instead of Blosc ZSTD at ``compression_level``,
+        e.g. ``NDSI_COMPRESSOR`` (Blosc ZSTD with bit-shuffle).
         
     Returns
     -------
@@ -94,8 +160,8 @@ def save_as_zarr(
     Raises
     ------
     ValueError
-        If dtype is not one of 'float16', 'float32', 'float64'.
-        Integer types are explicitly rejected.
+        If dtype is not one of 'float16', 'float32', 'float64', 'uint8'.
+        Other integer types are explicitly rejected.
         
     Examples
     --------
@@ -112,8 +178,8 @@ def save_as_zarr(
     zarr_path = os.path.join(output_folder, f"{file_name}.zarr")
     
     # Validate and apply dtype conversion for data variables only
-    valid_dtypes = {'float16': np.float16, 'float32': np.float32, 'float64': np.float64}
-    invalid_dtypes = ['int8', 'int16', 'int32', 'int64', 'uint8', 'uint16', 'uint32', 'uint64']
+    valid_dtypes = {'float16': np.float16, 'float32': np.float32, 'float64': np.float64, 'uint8': np.uint8}
+    invalid_dtypes = ['int8', 'int16', 'int32', 'int64', 'uint16', 'uint32', 'uint64']
     
     if dtype is not None:
         dtype_lower = dtype.lower().strip()
@@ -121,7 +187,7 @@ def save_as_zarr(
         # Check for integer types and reject them
         if dtype_lower in invalid_dtypes:
             raise ValueError(
-                f"Invalid dtype '{dtype}'. Integer types are not supported because:\\n"
+                f"Invalid dtype '{dtype}'. Integer types other than 'uint8' are not supported because:\\n"
                 f"  - NDSI data requires NaN representation for missing values\\n"
                 f"  - Integer types cannot represent NaN\\n"
                 f"  - Minimum supported dtype is 'float16' (sufficient for NDSI range 0-100)\\n"
@@ -136,36 +202,82 @@ def save_as_zarr(
             )
         
         target_dtype = valid_dtypes[dtype_lower]
-        
-        # Convert only DATA variables to the target dtype
-        # Coordinates (lat, lon, time) remain in their original precision
-        ds_converted = ds.copy()
-        for var in ds.data_vars:
-            if ds[var].dtype != target_dtype:
-                ds_converted[var] = ds[var].astype(target_dtype)
-        ds = ds_converted
+    else:
+        target_dtype = None
     
     # Determine chunk sizes
     if chunks is None:
-        # Adaptive chunking based on data size
-        chunks = _calculate_optimal_chunks(ds)
-    
-    # Create compressor
-    compressor = Zstd(level=compression_level)
+        # Adaptive chunking based on data size (in the stored dtype)
+        itemsize = np.dtype(target_dtype).itemsize if target_dtype is not None else None
+        chunks = _calculate_optimal_chunks(ds, itemsize=itemsize)
+    
+    # Data variable names looked up once; shapes and dtypes are read from
+    # the underlying Variables rather than building DataArrays
+    data_var_names = tuple(ds.data_vars)
+    
+    # Per-variable chunk and shard shapes (chunks clamped to the data extent)
+    layouts = {}
+    for var in data_var_names:
+        variable = ds.variables[var]
+        var_chunks = tuple(map(min, chunks, variable.shape))
+        layouts[var] = (var_chunks, _shard_shape(var_chunks, variable.shape))
+    
+    if target_dtype is not None:
+        # Convert only DATA variables to the target dtype
+        # Coordinates (lat, lon, time) remain in their original precision.
+        # The cast is applied lazily on the write shards, so a converted
+        # copy of the full array is never held in memory. Variables already
+        # in the target dtype are written as-is, without any copy.
+        # Floats stored as uint8 are only clipped here; xarray's CF encoding
+        # rounds them and maps NaN to the fill value while writing.
+        converted = {}
+        quantized = set()
+        for var in data_var_names:
+            variable = ds.variables[var]
+            if variable.dtype != target_dtype:
+                var_shards = dict(zip(variable.dims, layouts[var][1]))
+                if target_dtype == np.uint8 and np.issubdtype(variable.dtype, np.floating):
+                    clipped = ds[var].chunk(var_shards).clip(0, 100, keep_attrs=True)
+                    # The float NaN fill is replaced by the uint8 one in encoding
+                    clipped.attrs.pop('_FillValue', None)
+                    converted[var] = clipped
+                    quantized.add(var)
+                else:
+                    converted[var] = ds[var].chunk(var_shards).astype(target_dtype)
+        if converted:
+            ds = ds.assign(converted)
+    else:
+        quantized = set()
+    
+    # Dask-backed variables are written shard by shard; their Dask chunks
+    # must not straddle shard boundaries (a no-op for the converted ones)
+    realigned = {
+        var: ds[var].chunk(dict(zip(ds.variables[var].dims, layouts[var][1])))
+        for var in data_var_names
+        if ds.variables[var].chunks is not None
+    }
+    if realigned:
+        ds = ds.assign(realigned)
     
-    # Build encoding for all data variables
+    # Build encoding for all data variables (default codec follows each
+    # variable's stored dtype)
     encoding = {}
-    for var in ds.data_vars:
-        var_shape = ds[var].shape
-        # Adjust chunks if larger than data dimensions
-        var_chunks = tuple(min(c, s) for c, s in zip(chunks, var_shape))
+    for var in data_var_names:
+        var_chunks, var_shards = layouts[var]
+        stored_dtype = np.uint8 if var in quantized else ds.variables[var].dtype
+        var_compressor = compressor if compressor is not None else _make_compressor(compression_level, stored_dtype)
         encoding[var] = {
-            'compressors': (compressor,),
-            'chunks': var_chunks
+            'compressors': (var_compressor,),
+            'chunks': var_chunks,
+            'shards': var_shards
         }
+        if var in quantized:
+            encoding[var].update(dtype='uint8', _FillValue=NDSI_UINT8_FILL_VALUE)
     
     # Save to Zarr
-    ds.to_zarr(zarr_path, mode='w', encoding=encoding)
+    # Consolidated metadata lets readers open the store with a single
+    # metadata read instead of one per array
+    ds.to_zarr(zarr_path, mode='w', encoding=encoding, consolidated=True)
     
     return zarr_path
 
@@ -192,8 +304,10 @@ def find_optimal_zarr_params(
         Fraction of time steps to use for testing (0.0-1.0). Default 0.1 (10%).
         Higher values give more accurate results but take longer.
     compression_levels : list of int, optional
-        ZSTD compression levels to test. Default [1, 3, 5, 9].
-        Higher levels = better compression, slower write.
+        ZSTD compression levels to test. Default [1, 3, 5, 9], narrowed by
+        a quick compressibility probe of the sample: only [1] for nearly
+        incompressible data (ratio > 0.9), [3, 9] for highly compressible
+        data (ratio < 0.3). Higher levels = better compression, slower write.
     chunk_factors : list of tuple, optional
         Chunk size multipliers for (lat, lon, time). Default tests various sizes.
     target_metric : str
@@ -214,6 +328,8 @@ def find_optimal_zarr_params(
             'all_results': list  # All tested combinations
         }
     """
+    # Default levels may be narrowed by the compressibility probe below
+    probe_levels = compression_levels is None
     if compression_levels is None:
         compression_levels = [1, 3, 5, 9]
     
@@ -224,7 +340,7 @@ def find_optimal_zarr_params(
         if verbose:
             print("Optimization only supports 3D datasets. Using default parameters.")
         return {
-            'compression_level': 3,
+            'compression_level': COMPRESSION_LEVEL_TIERS.get(target_metric, 1),
             'chunks': DEFAULT_CHUNKS,
             'estimated_size_mb': None,
             'write_speed_mb_s': None,
@@ -248,67 +364,59 @@ def find_optimal_zarr_params(
     
     if verbose:
         print(f"Testing Zarr optimization with {sample_time}/{time_size} time steps...")
+    
+    # Load the sample once so the parallel writes do not each recompute it
+    ds_sample = ds_sample.load()
+    sample_vars = {
+        var: (ds_sample.variables[var].shape, ds_sample.variables[var].dtype)
+        for var in ds_sample.data_vars
+    }
+    
+    if probe_levels:
+        ratio_hint = _compression_ratio_hint(ds_sample.variables[first_var].values)
+        if ratio_hint is not None:
+            if ratio_hint > 0.9:
+                # Nearly incompressible: higher levels cannot shrink it further
+                compression_levels = [1]
+            elif ratio_hint < 0.3:
+                # Highly compressible: compare the balanced and maximum levels
+                compression_levels = [3, 9]
+            if verbose:
+                print(f"Compressibility probe ratio {ratio_hint:.2f}: "
+                      f"testing levels {compression_levels}")
+    # Candidates that coincide once clamped to the sample are tested once
+    chunk_factors = list(dict.fromkeys(
+        tuple(map(min, chunks, (lat_size, lon_size, sample_time))) for chunks in chunk_factors
+    ))
+    configs = list(itertools.product(compression_levels, chunk_factors))
+    if verbose:
         print(f"Testing {len(compression_levels)} compression levels x {len(chunk_factors)} chunk configs\n")
     
+    # Benchmark stores are held in memory, so write speeds reflect
+    # compression, not the disk. Half the cores: Blosc runs its own threads
+    max_workers = min(len(configs), max(1, (os.cpu_count() or 2) // 2))
     results = []
-    temp_dir = tempfile.mkdtemp(prefix='zarr_opt_')
-    
-    try:
-        for comp_level in compression_levels:
-            for chunks in chunk_factors:
-                valid_chunks = (
-                    min(chunks[0], lat_size),
-                    min(chunks[1], lon_size),
-                    min(chunks[2], sample_time)
+    
+    # Each configuration writes to its own store; compression releases
+    # the GIL, so the writes run concurrently in threads
+    if configs:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(
+                    _benchmark_zarr_config, ds_sample, sample_vars, comp_level, chunks, time_size
                 )
-                
-                test_path = os.path.join(temp_dir, f"test_c{comp_level}_ch{valid_chunks[2]}")
-                
-                compressor = Zstd(level=comp_level)
-                encoding = {}
-                for var in ds_sample.data_vars:
-                    var_shape = ds_sample[var].shape
-                    var_chunks = tuple(min(c, s) for c, s in zip(valid_chunks, var_shape))
-                    encoding[var] = {
-                        'compressors': (compressor,),
-                        'chunks': var_chunks
-                    }
-                
-                start_time = time.time()
-                ds_sample.to_zarr(test_path, mode='w', encoding=encoding)
-                write_time = time.time() - start_time
-                
-                total_size = 0
-                for root, dirs, files in os.walk(test_path):
-                    for f in files:
-                        total_size += os.path.getsize(os.path.join(root, f))
-                size_mb = total_size / (1024 * 1024)
-                
-                scale_factor = time_size / sample_time
-                estimated_full_size = size_mb * scale_factor
-                write_speed = size_mb / write_time if write_time > 0 else 0
-                
-                results.append({
-                    'compression_level': comp_level,
-                    'chunks': valid_chunks,
-                    'sample_size_mb': size_mb,
-                    'estimated_full_size_mb': estimated_full_size,
-                    'write_time_s': write_time,
-                    'write_speed_mb_s': write_speed
-                })
-                
-                shutil.rmtree(test_path, ignore_errors=True)
-                
-                if verbose:
-                    print(f"  ZSTD-{comp_level}, chunks={valid_chunks}: "
-                          f"{estimated_full_size:.1f}MB est., {write_speed:.1f}MB/s")
-    
-    finally:
-        shutil.rmtree(temp_dir, ignore_errors=True)
+                for comp_level, chunks in configs
+            ]
+            results.extend(future.result() for future in futures)
+    
+    if verbose:
+        for r in results:
+            print(f"  ZSTD-{r['compression_level']}, chunks={r['chunks']}: "
+                  f"{r['estimated_full_size_mb']:.1f}MB est., {r['write_speed_mb_s']:.1f}MB/s")
     
     if not results:
         return {
-            'compression_level': 3,
+            'compression_level': COMPRESSION_LEVEL_TIERS.get(target_metric, 1),
             'chunks': DEFAULT_CHUNKS,
             'estimated_size_mb': None,
             'write_speed_mb_s': None,
@@ -346,6 +454,61 @@ def find_optimal_zarr_params(
     }
 
 
+def _benchmark_zarr_config(
+    ds_sample: xr.Dataset,
+    sample_vars: Dict[str, Tuple[Tuple[int, ...], np.dtype]],
+    comp_level: int,
+    chunks: Tuple[int, int, int],
+    time_size: int
+) -> Dict[str, Any]:
+    """
+    Write ``ds_sample`` with one compression level and chunking, and measure it.
+    
+    Used by ``find_optimal_zarr_params``; ``sample_vars`` maps each data
+    variable to its (shape, dtype), computed once for all configurations.
+    The sample is written to an in-memory store, timed within the calling
+    worker, and its size is the total of the compressed chunks.
+    """
+    lat_size, lon_size, sample_time = next(iter(sample_vars.values()))[0]
+    valid_chunks = (
+        min(chunks[0], lat_size),
+        min(chunks[1], lon_size),
+        min(chunks[2], sample_time)
+    )
+    
+    encoding = {}
+    for var, (var_shape, var_dtype) in sample_vars.items():
+        var_chunks = tuple(map(min, valid_chunks, var_shape))
+        encoding[var] = {
+            'compressors': (_make_compressor(comp_level, var_dtype),),
+            'chunks': var_chunks
+        }
+    
+    store_dict = {}
+    start_time = time.perf_counter()
+    ds_sample.to_zarr(MemoryStore(store_dict=store_dict), mode='w', encoding=encoding,
+                      consolidated=False)
+    write_time = time.perf_counter() - start_time
+    
+    # Chunk payload only: metadata does not grow with the time dimension
+    size_mb = sum(
+        len(buf) for key, buf in store_dict.items() if not key.endswith('zarr.json')
+    ) / (1024 * 1024)
+    
+    scale_factor = time_size / sample_time
+    estimated_full_size = size_mb * scale_factor
+    write_speed = size_mb / write_time if write_time > 0 else 0
+    
+    return {
+        'compression_level': comp_level,
+        'chunks': valid_chunks,
+        'sample_size_mb': size_mb,
+        'estimated_full_size_mb': estimated_full_size,
+        'write_time_s': write_time,
+        'write_speed_mb_s': write_speed
+    }
+
+
 def save_as_zarr_optimized(
     ds: xr.Dataset,
     output_folder: str,
@@ -370,11 +533,13 @@ def save_as_zarr_optimized(
     auto_optimize : bool
         If True, find optimal compression/chunking. If False, use defaults.
     optimization_target : str
-        'size', 'speed', or 'balanced'. Only used if auto_optimize=True.
+        'size', 'speed', or 'balanced'. Selects the compression level tier
+        (1, 3 or 9, see ``COMPRESSION_LEVEL_TIERS``) and the metric used to
+        pick the chunking when auto_optimize=True.
     sample_fraction : float
         Fraction of data to use for optimization testing.
     dtype : str, optional
-        Output dtype ('float16', 'float32', 'float64').
+        Output dtype ('float16', 'float32', 'float64', 'uint8').
     verbose : bool
         Print progress.
         
@@ -383,20 +548,28 @@ def save_as_zarr_optimized(
     tuple
         (zarr_path, optimization_results)
     """
+    if optimization_target not in COMPRESSION_LEVEL_TIERS:
+        raise ValueError(
+            f"Invalid optimization_target '{optimization_target}'. "
+            f"Must be one of: {list(COMPRESSION_LEVEL_TIERS)}"
+        )
+    
+    # The level comes from the target's tier; only the chunking is searched
+    compression_level = COMPRESSION_LEVEL_TIERS[optimization_target]
+    
     if auto_optimize:
         if verbose:
             print("Finding optimal Zarr parameters...")
         opt_results = find_optimal_zarr_params(
             ds,
             sample_fraction=sample_fraction,
+            compression_levels=[compression_level],
             target_metric=optimization_target,
             verbose=verbose
         )
-        compression_level = opt_results['compression_level']
         chunks = opt_results['chunks']
     else:
-        opt_results = {'compression_level': 3, 'chunks': None, 'all_results': []}
-        compression_level = 3
+        opt_results = {'compression_level': compression_level, 'chunks': None, 'all_results': []}
         chunks = None
     
     zarr_path = save_as_zarr(
@@ -411,51 +584,59 @@ def save_as_zarr_optimized(
     return zarr_path, opt_results
 
 
-def _calculate_optimal_chunks(ds: xr.Dataset) -> Tuple[int, int, int]:
+def _compression_ratio_hint(data: np.ndarray, max_bytes: int = 4_000_000) -> Optional[float]:
+    """
+    Estimate compressibility from up to ``max_bytes`` of ``data``.
+    
+    Compresses a contiguous sample with Blosc ZSTD level 1 (with the same
+    shuffle as the default codec) and returns compressed/raw size, or None
+    when numcodecs' Blosc is not available.
+    """
+    if not EXTRA_CODECS_AVAILABLE:
+        return None
+    flat = np.ravel(data)
+    probe = np.ascontiguousarray(flat[:max(1, max_bytes // flat.itemsize)])
+    if probe.nbytes == 0:
+        return None
+    shuffle = Blosc.BITSHUFFLE if probe.itemsize == 2 else Blosc.SHUFFLE
+    codec = Blosc(cname='zstd', clevel=1, shuffle=shuffle)
+    return len(codec.encode(probe)) / probe.nbytes
+
+
+def _calculate_optimal_chunks(ds: xr.Dataset, itemsize: Optional[int] = None) -> Tuple[int, int, int]:
     """
     Calculate optimal chunk sizes based on dataset dimensions.
     
-    Aims for chunks of approximately 1-4 MB for efficient I/O.
+    Aims for chunks of approximately ``TARGET_CHUNK_BYTES`` (128 KB) in the
+    stored dtype, balanced between spatial tiles and time so that both map
+    and per-pixel time-series reads stay cheap. ``itemsize`` is the stored
+    element size in bytes; defaults to that of the first data variable.
     """
     # Get first data variable to determine shape
     first_var = list(ds.data_vars)[0]
     shape = ds[first_var].shape
+    if itemsize is None:
+        itemsize = ds[first_var].dtype.itemsize
     
     if len(shape) == 3:
         lat_size, lon_size, time_size = shape
-        
-        # Target chunk size in elements (assuming float64 = 8 bytes)
-        # Target ~2MB chunks: 2MB / 8 bytes = 262144 elements
-        target_elements = 262144
-        
-        # Prioritize spatial chunking for MODIS data
-        # Time dimension gets smaller chunks for efficient temporal slicing
-        if lat_size * lon_size <= target_elements:
-            # Small spatial extent: use full spatial dims
-            lat_chunk = lat_size
-            lon_chunk = lon_size
-            time_chunk = max(1, min(time_size, target_elements // (lat_size * lon_size)))
-        else:
-            # Larger spatial extent: balance spatial and temporal
-            spatial_chunk = int(np.sqrt(target_elements / 32))  # Assume ~32 time steps
-            lat_chunk = min(lat_size, max(64, spatial_chunk))
-            lon_chunk = min(lon_size, max(64, spatial_chunk))
-            time_chunk = min(time_size, 32)
-        
-        return (lat_chunk, lon_chunk, time_chunk)
+        return compute_balanced_chunks(
+            lat_size, lon_size, time_size, itemsize, target_bytes=TARGET_CHUNK_BYTES
+        )
     
     elif len(shape) == 2:
-        # 2D data (e.g., DEM)
+        # 2D data (e.g., DEM): same budget as a single time step
         lat_size, lon_size = shape
-        chunk_size = int(np.sqrt(262144))  # ~512
-        return (min(lat_size, chunk_size), min(lon_size, chunk_size))
+        return compute_balanced_chunks(
+            lat_size, lon_size, 1, itemsize, target_bytes=TARGET_CHUNK_BYTES
+        )[:2]
     
     else:
         # Default fallback
         return DEFAULT_CHUNKS[:len(shape)]
 
 
-def load_dem_and_nanmask(dem_data) -> Tuple[np.ndarray, np.ndarray]:
+def load_dem_and_nanmask(dem_data, packed: bool = False) -> Tuple[np.ndarray, np.ndarray]:
     """
     Load DEM data and create NaN mask for invalid pixels.
     
@@ -464,49 +645,102 @@ def load_dem_and_nanmask(dem_data) -> Tuple[np.ndarray, np.ndarray]:
     dem_data : str or xr.Dataset
         Either a path to a Zarr store containing DEM data, or an xarray
         Dataset with 'elevation' variable.
+    packed : bool
+        Return the NaN mask bit-packed (1 bit per pixel, 8x smaller) instead
+        of as a boolean array. Default False.
         
     Returns
     -------
     dem : np.ndarray
         2D array of elevation values.
     nanmask : np.ndarray
-        2D boolean array where True indicates invalid (NaN) pixels.
+        2D boolean array where True indicates invalid (NaN) pixels. With
+        ``packed=True``, a 1D uint8 array from ``np.packbits`` over the
+        flattened (C-order) mask; ``np.count_nonzero(np.unpackbits(nanmask))``
+        counts invalid pixels, and
+        ``np.unpackbits(nanmask, count=dem.size).reshape(dem.shape).view(bool)``
+        restores the boolean mask. Single pixels are tested with
+        ``(nanmask[k >> 3] >> (7 - (k & 7))) & 1`` for flat index ``k``.
+        
+    Raises
+    ------
+    ValueError
+        If the elevation array is not 2D once singleton dimensions are removed.
     """
     if isinstance(dem_data, str):
-        # Load from Zarr path
-        dem = zarr.open(dem_data, mode='r')['elevation'][:]
+        # Load from Zarr path, decoding one block of chunk rows at a time
+        # straight into the float64 result (no full-size stored-dtype copy)
+        z = zarr.open(dem_data, mode='r')['elevation']
+        dem = np.empty(z.shape, dtype=np.float64)
+        step = z.chunks[0]
+        for start in range(0, z.shape[0], step):
+            dem[start:start + step] = z[start:start + step]
     elif isinstance(dem_data, xr.Dataset):
-        # Extract from xarray Dataset
-        dem_ds = dem_data
+        # Extract the elevation variable from the xarray Dataset
+        elevation = dem_data['elevation']
         
         # Handle time dimension if present (take first time step)
-        if 'time' in dem_ds.dims:
-            dem_ds = dem_ds.isel(time=0)
+        if 'time' in elevation.dims:
+            elevation = elevation.isel(time=0)
         
-        # Ensure proper dimension order (lat, lon)
-        if set(dem_ds.dims) == {'lat', 'lon'}:
-            dem_ds = dem_ds.transpose('lat', 'lon')
-        elif set(dem_ds.dims) == {'lon', 'lat'}:
-            dem_ds = dem_ds.transpose('lat', 'lon')
-            
-        dem = dem_ds['elevation'].values
+        # Ensure proper dimension order (lat, lon); arrays already in that
+        # order are used as-is
+        if elevation.dims == ('lon', 'lat'):
+            elevation = elevation.transpose('lat', 'lon')
+        
+        # NumPy-backed data is returned without a copy; Dask-backed data is
+        # computed once
+        dem = elevation.values
     else:
         raise TypeError(f"dem_data must be str or xr.Dataset, got {type(dem_data)}")
     
-    # Ensure 2D
-    if dem.ndim == 3:
-        dem = dem[:, :, 0] if dem.shape[2] == 1 else dem[0, :, :]
+    # Ensure 2D: drop singleton axes, e.g. (1, lat, lon) or (lat, lon, 1)
+    # from a time-degenerate store (a view, no copy)
+    if dem.ndim > 2:
+        squeezed = np.squeeze(dem)
+        if squeezed.ndim != 2:
+            raise ValueError(
+                f"DEM must be 2D after removing singleton dimensions, got shape {dem.shape}"
+            )
+        dem = squeezed
+    
+    if dem.dtype == np.float64 and dem.flags.c_contiguous:
+        # Already in final form (always the case for Zarr paths): no copy,
+        # only the NaN mask pass
+        nanmask = np.isnan(dem)
+    else:
+        # Cast and NaN mask fused into one parallel pass over the DEM
+        src = dem
+        dem = np.empty(src.shape, dtype=np.float64)
+        nanmask = np.empty(src.shape, dtype=np.bool_)
+        cast_float64_with_nanmask(src, dem, nanmask)
     
-    # Create NaN mask
-    nanmask = np.isnan(dem)
+    if packed:
+        nanmask = np.packbits(nanmask, axis=None)
     
-    return dem.astype(np.float64), nanmask
+    return dem, nanmask
+
+
+# Files whose changes invalidate a cached shapefile read. The .shx index is
+# left out: with SHAPE_RESTORE_SHX enabled GDAL may rewrite it on every open
+_SHAPEFILE_SIDECARS = ('.shp', '.dbf', '.prj', '.cpg')
+
+
+@lru_cache(maxsize=32)
+def _read_shapefile_cached(abs_path: str, signature: Tuple) -> gpd.GeoDataFrame:
+    """Read a vector file; ``signature`` only keys the cache on file changes."""
+    return gpd.read_file(abs_path)
 
 
 def load_shapefile(shp_path: str) -> gpd.GeoDataFrame:
     """
     Load shapefile using geopandas.
     
+    Parsed files are cached on their absolute path and the modification
+    times of the shapefile and its sidecar files (.dbf, .prj, .cpg),
+    so repeated loads of an unchanged file skip the parse. Each call
+    returns its own copy, so callers may modify it freely.
+    
     Parameters
     ----------
     shp_path : str
@@ -517,13 +751,23 @@ def load_shapefile(shp_path: str) -> gpd.GeoDataFrame:
     gpd.GeoDataFrame
         Loaded shapefile data.
     """
-    return gpd.read_file(shp_path)
+    abs_path = os.path.abspath(shp_path)
+    base, ext = os.path.splitext(abs_path)
+    candidates = [base + sidecar for sidecar in _SHAPEFILE_SIDECARS] if ext.lower() == '.shp' else [abs_path]
+    signature = tuple(
+        os.stat(path).st_mtime_ns if os.path.exists(path) else None
+        for path in candidates
+    )
+    return _read_shapefile_cached(abs_path, signature).copy()
 
 
 def load_zarr_dataset(zarr_path: str) -> xr.Dataset:
     """
     Load a Zarr store as xarray Dataset.
     
+    Consolidated metadata is used when the store has it (as written by
+    ``save_as_zarr``), and the Dask chunks follow the stored Zarr chunks.
+    
     Parameters
     ----------
     zarr_path : str
@@ -534,7 +778,7 @@ def load_zarr_dataset(zarr_path: str) -> xr.Dataset:
     xr.Dataset
         Loaded dataset.
     """
-    return xr.open_zarr(zarr_path)
+    return xr.open_zarr(zarr_path, consolidated=None, chunks={})
 
 
 # Legacy function - kept for backward compatibility but deprecated
@@ -542,7 +786,7 @@ def optimal_combination(data, save_dir=None, vname=None, chunk_factors=None,
                         compressors=None, sample_size=256):
     """
     .. deprecated::
-        This function is deprecated and does nothing. ZSTD level 3 is now
+        This function is deprecated and does nothing. Blosc ZSTD level 1 is now
         used by default, which provides excellent compression without the
         overhead of testing multiple combinations.
         
@@ -556,7 +800,7 @@ def optimal_combination(data, save_dir=None, vname=None, chunk_factors=None,
     import warnings
     warnings.warn(
         "optimal_combination is deprecated and has no effect. "
-        "ZSTD level 3 compression is now used by default, which provides "
+        "Blosc ZSTD level 1 compression is now used by default, which provides "
         "excellent compression without the overhead of testing combinations.",
         DeprecationWarning,
         stacklevel=2
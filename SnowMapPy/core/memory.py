@@ -14,10 +14,48 @@ Version: 2.0.0
 """
 
 import gc
+import math
+import os
 import sys
-from typing import Optional, Callable
+import tempfile
+import threading
+import warnings
+from contextlib import contextmanager
+from typing import Optional, Callable, Tuple
 import numpy as np
 
+from . import console
+from .utils import compute_balanced_chunks
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+_MB = 1.0 / (1024 * 1024)
+_GB = 1.0 / (1024 ** 3)
+
+# Process handle reused across calls; rebuilt in forked workers
+_process = None
+_process_pid = None
+
+
+def _current_process():
+    """Return a cached psutil.Process for the current process."""
+    global _process, _process_pid
+    pid = os.getpid()
+    if _process_pid != pid:
+        _process = psutil.Process(pid)
+        _process_pid = pid
+    return _process
+
+
+def _print_memory(message: str, *args) -> None:
+    """Print a ``[Memory]`` line (``%``-formatted with args, only when printed)."""
+    if not console._VERBOSE:
+        return
+    print("  [Memory]", message % args if args else message)
+
 
 def get_memory_usage_mb() -> float:
     """
@@ -28,12 +66,9 @@ def get_memory_usage_mb() -> float:
     float
         Memory usage in megabytes, or -1 if psutil is not available.
     """
-    try:
-        import psutil
-        process = psutil.Process()
-        return process.memory_info().rss / (1024 * 1024)
-    except ImportError:
+    if psutil is None:
         return -1.0
+    return _current_process().memory_info().rss * _MB
 
 
 def get_memory_usage_gb() -> float:
@@ -58,7 +93,8 @@ def log_memory(stage: str, verbose: bool = True) -> float:
     stage : str
         Description of the current processing stage.
     verbose : bool
-        Whether to print the memory usage.
+        Whether to print the memory usage. Output is also silenced
+        package-wide by ``set_verbose(False)``.
         
     Returns
     -------
@@ -67,7 +103,7 @@ def log_memory(stage: str, verbose: bool = True) -> float:
     """
     mem_gb = get_memory_usage_gb()
     if verbose and mem_gb >= 0:
-        print(f"  [Memory] {stage}: {mem_gb:.2f} GB")
+        _print_memory("%s: %.2f GB", stage, mem_gb)
     return mem_gb
 
 
@@ -88,7 +124,8 @@ def estimate_array_memory_gb(shape: tuple, dtype=np.float64) -> float:
         Estimated memory in gigabytes.
     """
     dtype = np.dtype(dtype)
-    size_bytes = np.prod(shape) * dtype.itemsize
+    # Python ints: np.prod can overflow silently for large shapes
+    size_bytes = math.prod(int(n) for n in shape) * dtype.itemsize
     return size_bytes / (1024 ** 3)
 
 
@@ -120,6 +157,9 @@ def estimate_dataset_memory(n_days: int, lat_pixels: int, lon_pixels: int,
     }
     
     bytes_per_value = dtype_sizes.get(dtype, 8)
+    # Python ints throughout, so NumPy integer inputs (e.g. from an array
+    # shape) cannot overflow in the products below
+    n_days, lat_pixels, lon_pixels = int(n_days), int(lat_pixels), int(lon_pixels)
     total_pixels = n_days * lat_pixels * lon_pixels
     
     # Main NDSI array
@@ -128,11 +168,11 @@ def estimate_dataset_memory(n_days: int, lat_pixels: int, lon_pixels: int,
     # Terra + Aqua (2x for values, 2x for classes)
     input_bytes = total_pixels * 8 * 4  # float64 for processing
     
-    # DEM (2D)
-    dem_bytes = lat_pixels * lon_pixels * 8
+    # DEM (2D, float32)
+    dem_bytes = lat_pixels * lon_pixels * 4
     
-    # Moving window arrays (6 days x 2 sensors x 2 types)
-    window_bytes = 6 * lat_pixels * lon_pixels * 8 * 4
+    # Moving window arrays (6 days x 2 sensors x 2 types, float32)
+    window_bytes = 6 * lat_pixels * lon_pixels * 4 * 4
     
     return {
         'ndsi_output_gb': ndsi_bytes / (1024**3),
@@ -145,25 +185,95 @@ def estimate_dataset_memory(n_days: int, lat_pixels: int, lon_pixels: int,
     }
 
 
-def cleanup(*args) -> None:
+def suggest_chunks(shape: tuple, dtype='float32', target_chunk_mb: float = 128,
+                   max_tasks: int = 1_000_000) -> Tuple[int, int, int]:
     """
-    Explicitly delete objects and force garbage collection.
+    Suggest Dask chunks for a (lat, lon, time) cube.
+    
+    Chunks are sized to about ``target_chunk_mb`` each. If that would
+    split the cube into more than ``max_tasks`` chunks (the task graph
+    itself then costs significant memory and scheduling time), the chunks
+    are enlarged until the count fits and a warning is emitted.
     
     Parameters
     ----------
-    *args : objects
-        Objects to delete.
+    shape : tuple
+        Cube shape (lat, lon, time).
+    dtype : numpy dtype
+        Data type of the cube.
+    target_chunk_mb : float
+        Target uncompressed chunk size in MB. Default 128.
+    max_tasks : int
+        Maximum number of chunks. Default 1,000,000.
         
-    Usage
-    -----
-    >>> cleanup(large_array, temp_result, old_dataset)
+    Returns
+    -------
+    tuple
+        Chunk sizes (lat, lon, time).
     """
-    for obj in args:
-        try:
-            del obj
-        except:
-            pass
-    gc.collect()
+    n_lat, n_lon, n_time = (int(n) for n in shape)
+    itemsize = np.dtype(dtype).itemsize
+    target_bytes = int(target_chunk_mb * 1024 * 1024)
+    time_chunk = min(n_time, 64)
+    
+    def n_chunks(chunks):
+        return math.prod(-(-n // c) for n, c in zip((n_lat, n_lon, n_time), chunks))
+    
+    chunks = compute_balanced_chunks(n_lat, n_lon, n_time, itemsize, target_bytes, time_chunk)
+    initial = chunks
+    while n_chunks(chunks) > max_tasks and chunks != (n_lat, n_lon, n_time):
+        target_bytes *= 2
+        time_chunk = min(n_time, time_chunk * 2)
+        chunks = compute_balanced_chunks(n_lat, n_lon, n_time, itemsize, target_bytes, time_chunk)
+    
+    if chunks != initial:
+        warnings.warn(
+            f"Chunks of ~{target_chunk_mb} MB would create more than {max_tasks} "
+            f"tasks; using larger chunks {chunks} ({n_chunks(chunks)} tasks)",
+            UserWarning,
+            stacklevel=2
+        )
+    
+    return chunks
+
+
+def force_gc(generation: int = 2) -> int:
+    """
+    Run the garbage collector.
+    
+    Arrays are freed as soon as their last reference goes away, so this is
+    only needed to reclaim objects caught in reference cycles. To release
+    an array, ``del`` it in the scope that holds it before calling this.
+    
+    Parameters
+    ----------
+    generation : int
+        Oldest generation to collect (0-2). Default 2 (full collection).
+        
+    Returns
+    -------
+    int
+        Number of unreachable objects found.
+    """
+    return gc.collect(generation)
+
+
+def cleanup(*args) -> None:
+    """
+    Force a full garbage collection (deprecated).
+    
+    .. deprecated::
+        Use ``del`` on the objects in the caller's scope, then
+        ``force_gc()``. The arguments are ignored: deleting them here
+        only removed this function's own references, never the caller's.
+    """
+    warnings.warn(
+        "cleanup is deprecated. Delete references with 'del' in the calling "
+        "scope, then call force_gc() if needed.",
+        DeprecationWarning,
+        stacklevel=2
+    )
+    force_gc()
 
 
 def check_memory_available(required_gb: float, safety_factor: float = 1.5) -> bool:
@@ -182,13 +292,119 @@ def check_memory_available(required_gb: float, safety_factor: float = 1.5) -> bo
     bool
         True if sufficient memory available, False otherwise.
     """
-    try:
-        import psutil
-        available_gb = psutil.virtual_memory().available / (1024 ** 3)
-        return available_gb >= (required_gb * safety_factor)
-    except ImportError:
+    if psutil is None:
         # If psutil not available, assume we have enough memory
         return True
+    available_gb = psutil.virtual_memory().available * _GB
+    return available_gb >= (required_gb * safety_factor)
+
+
+def allocate_cube(shape: tuple, dtype=np.float32, path: Optional[str] = None) -> np.ndarray:
+    """
+    Allocate a (lat, lon, time) array backed by a memory-mapped file.
+    
+    The operating system keeps recently used pages in RAM and writes cold
+    ones back to disk, so cubes larger than the available memory can be
+    filled day by day. The file is laid out time-first, so each day slice
+    ``cube[:, :, t]`` is one contiguous block on disk.
+    
+    Parameters
+    ----------
+    shape : tuple
+        Array shape (lat, lon, time).
+    dtype : numpy dtype
+        Data type of the array.
+    path : str, optional
+        Backing file. Default is an anonymous temporary file, removed from
+        the file system immediately (its space is freed once the array
+        is released).
+        
+    Returns
+    -------
+    np.memmap
+        Transposed view of shape (lat, lon, time) on the time-first file.
+    """
+    n_lat, n_lon, n_time = shape
+    
+    if path is None:
+        fd, path = tempfile.mkstemp(suffix='.dat', prefix='snowmappy_cube_')
+        os.close(fd)
+        cube = np.memmap(path, dtype=dtype, mode='w+', shape=(n_time, n_lat, n_lon))
+        try:
+            os.unlink(path)
+        except OSError:
+            # Windows cannot unlink a mapped file; it stays in the temp dir
+            pass
+    else:
+        cube = np.memmap(path, dtype=dtype, mode='w+', shape=(n_time, n_lat, n_lon))
+    
+    return cube.transpose(1, 2, 0)
+
+
+# Per-thread pool of reusable arrays, keyed on (shape, dtype)
+_POOL = threading.local()
+_POOL_MAX_PER_KEY = 8
+
+
+def _pool_buffers(shape: tuple, dtype) -> list:
+    """Return this thread's free list for (shape, dtype)."""
+    pool = getattr(_POOL, 'buffers', None)
+    if pool is None:
+        pool = _POOL.buffers = {}
+    return pool.setdefault((tuple(shape), np.dtype(dtype)), [])
+
+
+def acquire_buffer(shape: tuple, dtype=np.float32) -> np.ndarray:
+    """
+    Get an uninitialized array, reusing a released one when available.
+    
+    Per-day loops that need a fresh array of the same shape on every
+    iteration can recycle a few buffers instead of allocating each time.
+    The contents are undefined, as with ``np.empty``.
+    
+    Parameters
+    ----------
+    shape : tuple
+        Array shape.
+    dtype : numpy dtype
+        Data type of the array.
+        
+    Returns
+    -------
+    np.ndarray
+        C-contiguous array of the requested shape and dtype.
+    """
+    free = _pool_buffers(shape, dtype)
+    return free.pop() if free else np.empty(shape, dtype=dtype)
+
+
+def release_buffer(arr: np.ndarray) -> None:
+    """
+    Return an array to the pool for reuse by ``acquire_buffer``.
+    
+    The caller must not use the array afterwards. Views and non-contiguous
+    arrays are not pooled.
+    """
+    if arr.base is not None or not arr.flags.c_contiguous:
+        return
+    free = _pool_buffers(arr.shape, arr.dtype)
+    if len(free) < _POOL_MAX_PER_KEY:
+        free.append(arr)
+
+
+@contextmanager
+def pooled_buffer(shape: tuple, dtype=np.float32):
+    """
+    Context manager around ``acquire_buffer``/``release_buffer``.
+    
+    >>> with pooled_buffer((400, 700), np.float32) as buf:
+    ...     apply_modis_quality_mask(values, classes, out=buf)
+    """
+    arr = acquire_buffer(shape, dtype)
+    try:
+        yield arr
+    finally:
+        release_buffer(arr)
 
 
 class MemoryTracker:
@@ -200,30 +416,52 @@ class MemoryTracker:
     >>> with MemoryTracker("Processing MODIS data") as tracker:
     ...     result = heavy_computation()
     >>> print(f"Peak memory: {tracker.peak_gb:.2f} GB")
+    
+    With ``use_memmap=True``, cubes allocated through the tracker are
+    file-backed and their size is reported apart from resident memory:
+    
+    >>> with MemoryTracker("Gap-filling", use_memmap=True) as tracker:
+    ...     cube = tracker.allocate_cube((400, 700, 365), np.float32)
     """
     
-    def __init__(self, operation_name: str = "", verbose: bool = True):
+    def __init__(self, operation_name: str = "", verbose: bool = True,
+                 use_memmap: bool = False):
         self.operation_name = operation_name
         self.verbose = verbose
+        self.use_memmap = use_memmap
         self.start_memory = 0.0
         self.end_memory = 0.0
         self.peak_gb = 0.0
+        self.mapped_gb = 0.0
+        
+    def allocate_cube(self, shape: tuple, dtype=np.float32, path: Optional[str] = None) -> np.ndarray:
+        """Allocate a (lat, lon, time) cube, file-backed if use_memmap is set."""
+        if not self.use_memmap:
+            return np.empty(shape, dtype=dtype)
+        cube = allocate_cube(shape, dtype, path)
+        self.mapped_gb += cube.nbytes / (1024 ** 3)
+        return cube
         
     def __enter__(self):
-        gc.collect()
+        # Young generation only: enough for a stable reading, without the
+        # cost of a full-heap scan
+        gc.collect(0)
         self.start_memory = get_memory_usage_gb()
         if self.verbose and self.operation_name and self.start_memory >= 0:
-            print(f"  [Memory] Starting {self.operation_name}: {self.start_memory:.2f} GB")
+            _print_memory("Starting %s: %.2f GB", self.operation_name, self.start_memory)
         return self
         
     def __exit__(self, exc_type, exc_val, exc_tb):
-        gc.collect()
+        gc.collect(0)
         self.end_memory = get_memory_usage_gb()
         delta = self.end_memory - self.start_memory
         self.peak_gb = max(self.start_memory, self.end_memory)
         
         if self.verbose and self.operation_name and self.end_memory >= 0:
-            print(f"  [Memory] Finished {self.operation_name}: {self.end_memory:.2f} GB (Δ{delta:+.2f} GB)")
+            _print_memory("Finished %s: %.2f GB (Δ%+.2f GB)",
+                          self.operation_name, self.end_memory, delta)
+            if self.use_memmap:
+                _print_memory("Memory-mapped cubes: %.2f GB on disk", self.mapped_gb)
         
         return False
 
@@ -250,6 +488,17 @@ def print_memory_summary(config: dict) -> None:
     
     estimates = estimate_dataset_memory(n_days, lat_pixels, lon_pixels, dtype)
     
+    if console._VERBOSE:
+        _print_estimates(estimates, suggest_chunks((lat_pixels, lon_pixels, n_days), dtype))
+    
+    # Check if we have enough memory
+    if not check_memory_available(estimates['total_peak_gb']):
+        print("⚠ WARNING: Estimated memory exceeds available RAM!")
+        print("  Consider using a smaller date range or closing other applications.")
+
+
+def _print_estimates(estimates: dict, chunks: tuple) -> None:
+    """Print the table shown by print_memory_summary."""
     print("=" * 60)
     print("MEMORY USAGE ESTIMATE")
     print("=" * 60)
@@ -262,9 +511,5 @@ def print_memory_summary(config: dict) -> None:
     print(f"Processing buffers:   {estimates['window_buffer_gb']:.2f} GB")
     print("-" * 60)
     print(f"ESTIMATED PEAK MEMORY: {estimates['total_peak_gb']:.2f} GB")
+    print(f"Suggested Dask chunks (lat, lon, time): {chunks}")
     print("=" * 60)
-    
-    # Check if we have enough memory
-    if not check_memory_available(estimates['total_peak_gb']):
-        print("⚠ WARNING: Estimated memory exceeds available RAM!")
-        print("  Consider using a smaller date range or closing other applications.")
@@ -14,38 +14,138 @@ Version: 2.0.0
 
 import numpy as np
 
+from .._numba_kernels import (
+    build_invalid_class_lut,
+    mask_invalid_classes,
+    mask_invalid_classes_pair
+)
+
+
+# Class codes, kept as module constants so lookups allocate nothing
+_VALID_CLASSES = (1, 2, 3)  # snow, no snow, water
+_INVALID_CLASSES = (200, 201, 211, 237, 239, 250, 254)
+_VALID_CLASS_SET = frozenset(_VALID_CLASSES)
+_INVALID_CLASS_ARRAY = np.array(_INVALID_CLASSES, dtype=np.uint16)
+
 
 def get_valid_modis_classes():
     """Return valid MODIS NDSI_Snow_Cover_Class values."""
-    return [1, 2, 3]  # snow, no snow, water
+    return list(_VALID_CLASSES)
 
 
 def get_invalid_modis_classes():
     """Return invalid MODIS class values that should be masked out."""
-    return [200, 201, 211, 237, 239, 250, 254]
+    return list(_INVALID_CLASSES)
 
 
 def validate_modis_class(class_value):
     """Check if a MODIS class value is valid for analysis."""
-    valid_classes = get_valid_modis_classes()
-    return class_value in valid_classes
+    return class_value in _VALID_CLASS_SET
+
+
+# Lookup table for the default invalid classes, built once at import
+_INVALID_CLASS_LUT = build_invalid_class_lut(_INVALID_CLASSES)
+
+# Arrays at least this large are masked with the fused Numba kernel
+_NUMBA_MASK_MIN_SIZE = 1_000_000
+
+
+def _class_lut(invalid_classes=None):
+    """256-entry invalid-class table; None when the codes are not integers in 0-255."""
+    if invalid_classes is None:
+        return _INVALID_CLASS_LUT
+    codes = np.asarray(invalid_classes)
+    if codes.size and (codes.min() < 0 or codes.max() > 255
+                       or not np.array_equal(codes, codes.astype(np.int64))):
+        return None
+    return build_invalid_class_lut(codes)
+
+
+def _lut_class_mask(class_data, invalid_classes=None):
+    """Invalid-class mask from a 256-entry table; None when data or codes exceed 8 bits."""
+    class_data = np.asarray(class_data)
+    if not np.issubdtype(class_data.dtype, np.integer) or class_data.size == 0:
+        return None
+    if class_data.dtype != np.uint8 and (class_data.min() < 0 or class_data.max() > 255):
+        return None
+    
+    lut = _class_lut(invalid_classes)
+    return None if lut is None else lut[class_data]
 
 
 def create_modis_class_mask(class_data, invalid_classes=None):
     """Create boolean mask for invalid MODIS class values."""
+    # Integer class codes within 0-255 use a table lookup (one pass);
+    # float data (e.g. with NaN) and other codes fall back to np.isin
+    mask = _lut_class_mask(class_data, invalid_classes)
+    if mask is not None:
+        return mask
+    
     if invalid_classes is None:
-        invalid_classes = get_invalid_modis_classes()
+        invalid_classes = _INVALID_CLASS_ARRAY
     
     return np.isin(class_data, invalid_classes)
 
 
-def apply_modis_quality_mask(value_data, class_data, invalid_classes=None):
-    """Apply quality mask to MODIS NDSI data, setting invalid pixels to NaN."""
-    if invalid_classes is None:
-        invalid_classes = get_invalid_modis_classes()
+def apply_modis_quality_mask(value_data, class_data, invalid_classes=None, out=None):
+    """
+    Apply quality mask to MODIS NDSI data, setting invalid pixels to NaN.
+    
+    The result is written to ``out`` when given (it may be ``value_data``
+    itself for an in-place update), so callers processing many time steps
+    can reuse one buffer instead of allocating a copy per step.
+    """
+    if out is None:
+        out = np.empty_like(value_data)
+    
+    # Large contiguous arrays: lookup, copy and NaN store in one parallel pass
+    if (value_data.size >= _NUMBA_MASK_MIN_SIZE
+            and np.shape(class_data) == value_data.shape == out.shape
+            and np.issubdtype(out.dtype, np.floating)
+            and value_data.flags.c_contiguous and out.flags.c_contiguous):
+        lut = _class_lut(invalid_classes)
+        if lut is not None:
+            classes = np.ascontiguousarray(class_data)
+            mask_invalid_classes(value_data.reshape(-1), classes.reshape(-1), lut, out.reshape(-1))
+            return out
+    
+    invalid_mask = create_modis_class_mask(class_data, invalid_classes)
+    if out is not value_data:
+        np.copyto(out, value_data, casting='unsafe')
+    np.copyto(out, np.nan, where=invalid_mask)
+    
+    return out
+
+
+def apply_modis_quality_mask_pair(terra_values, terra_class, aqua_values, aqua_class,
+                                  invalid_classes=None, out_terra=None, out_aqua=None):
+    """
+    Apply the quality mask to Terra and Aqua data together.
+    
+    Equivalent to calling ``apply_modis_quality_mask`` on each sensor, but
+    large same-shape arrays are masked in a single fused pass. Returns the
+    masked (terra, aqua) arrays.
+    """
+    if out_terra is None:
+        out_terra = np.empty_like(terra_values)
+    if out_aqua is None:
+        out_aqua = np.empty_like(aqua_values)
     
-    invalid_mask = np.isin(class_data, invalid_classes)
-    masked_data = value_data.copy()
-    masked_data[invalid_mask] = np.nan
+    arrays = (terra_values, terra_class, aqua_values, aqua_class, out_terra, out_aqua)
+    shape = terra_values.shape
+    if (terra_values.size >= _NUMBA_MASK_MIN_SIZE
+            and all(np.shape(a) == shape for a in arrays)
+            and np.issubdtype(out_terra.dtype, np.floating)
+            and np.issubdtype(out_aqua.dtype, np.floating)
+            and all(a.flags.c_contiguous for a in (terra_values, aqua_values, out_terra, out_aqua))):
+        lut = _class_lut(invalid_classes)
+        if lut is not None:
+            mask_invalid_classes_pair(
+                terra_values.reshape(-1), np.ascontiguousarray(terra_class).reshape(-1),
+                aqua_values.reshape(-1), np.ascontiguousarray(aqua_class).reshape(-1),
+                lut, out_terra.reshape(-1), out_aqua.reshape(-1)
+            )
+            return out_terra, out_aqua
     
-    return masked_data
\ No newline at end of file
+    return (apply_modis_quality_mask(terra_values, terra_class, invalid_classes, out_terra),
+            apply_modis_quality_mask(aqua_values, aqua_class, invalid_classes, out_aqua))
@@ -35,36 +35,29 @@ def check_overlap(src, roi):
 
 def clip_dem_to_roi(dem_path, roi, save_dir, file_name, oparams_file=None):
     """Clip DEM to region of interest and save as xarray Dataset."""
-    os.environ['SHAPE_RESTORE_SHX'] = 'YES'
+    os.environ.setdefault('SHAPE_RESTORE_SHX', 'YES')
 
+    # Only the ROI window is read; the full raster is never loaded
     with rasterio.open(dem_path) as src:
-        DEM = src.read(1).astype(np.float64)
         transform = src.transform
         crs = src.crs
-
-    # Handle common nodata values
-    DEM[DEM == 65536] = np.nan
-
-    with rasterio.open(dem_path) as src:
         DEM_clipped, out_transform = rasterio_mask(src, [roi.geometry.iloc[0]], crop=True, all_touched=True, pad=True)
         DEM_clipped = DEM_clipped[0]
 
-    # Create ROI mask
+    # Create ROI mask (boolean, True inside the ROI)
     ROI_mask = geometry_mask(roi.geometry, transform=out_transform, invert=True, out_shape=DEM_clipped.shape)
-    ROI_mask = np.where(ROI_mask == 0, np.nan, 1)
 
     if DEM_clipped.shape != ROI_mask.shape:
         raise ValueError(f"Shapes do not match: DEM_clipped shape {DEM_clipped.shape}, ROI_mask shape {ROI_mask.shape}")
 
-    DEM_ROI = DEM_clipped * ROI_mask
+    # Select instead of multiplying by a float64 NaN mask: one float32 pass
+    DEM_ROI = np.where(ROI_mask, DEM_clipped.astype(np.float32, copy=False), np.float32(np.nan))
 
-    # Generate coordinate arrays
+    # Generate coordinate axes (1-D; a full meshgrid is not needed). float32
+    # resolves well below the pixel size, whether in degrees or metres
     bounds = rasterio.transform.array_bounds(DEM_ROI.shape[0], DEM_ROI.shape[1], transform)
-    X, Y = np.meshgrid(np.linspace(bounds[0], bounds[2], DEM_ROI.shape[1]),
-                       np.linspace(bounds[3], bounds[1], DEM_ROI.shape[0]))
-
-    lat = Y[:, 0].tolist()
-    lon = X[0, :].tolist()
+    lat = np.linspace(bounds[3], bounds[1], DEM_ROI.shape[0], dtype=np.float32)
+    lon = np.linspace(bounds[0], bounds[2], DEM_ROI.shape[1], dtype=np.float32)
 
     ds = xr.Dataset(
         data_vars={
@@ -81,7 +74,7 @@ def clip_dem_to_roi(dem_path, roi, save_dir, file_name, oparams_file=None):
         }
     )
 
-    save_as_zarr(ds, save_dir, file_name, oparams_file)
+    save_as_zarr(ds, save_dir, file_name, params_file=oparams_file)
     return ds
 
 
@@ -96,7 +89,10 @@ def reproject_raster(src_path, dst_path, src_transform, src_crs, dst_transform,
             'height': shape[0]
         })
         
-        with rasterio.open(dst_path, 'w', **kwargs) as dst:
+        # Warp on all cores; GDAL_NUM_THREADS also lets the GeoTIFF driver
+        # compress output blocks in parallel
+        with rasterio.Env(GDAL_NUM_THREADS='ALL_CPUS'), \
+                rasterio.open(dst_path, 'w', **kwargs) as dst:
             for i in range(1, src.count + 1):
                 reproject(
                     source=rasterio.band(src, i),
@@ -105,7 +101,8 @@ def reproject_raster(src_path, dst_path, src_transform, src_crs, dst_transform,
                     src_crs=src.crs if not src_crs else src_crs,
                     dst_transform=dst_transform,
                     dst_crs=dst_crs,
-                    resampling=method
+                    resampling=method,
+                    num_threads=os.cpu_count() or 1
                 )
 
 
@@ -15,15 +15,23 @@ Authors: Haytam Elyoussfi, Hatim Bechri
 Version: 2.0.0
 """
 
+import os
+import dask
 import numpy as np
+import dask.array as da
 from typing import Literal
 
 # Import Numba-accelerated kernels
 from .._numba_kernels import (
     interpolate_nearest_3d,
     interpolate_linear_3d,
-    interpolate_cubic_3d
+    interpolate_cubic_3d,
+    interpolate_nearest_day,
+    interpolate_linear_day,
+    interpolate_cubic_day,
+    dequantize_uint8_3d
 )
+from .data_io import NDSI_UINT8_FILL_VALUE
 
 
 # Type alias for interpolation methods
@@ -33,7 +41,8 @@ InterpolationMethod = Literal["nearest", "linear", "cubic"]
 def interpolate_temporal(
     data: np.ndarray,
     nanmask: np.ndarray,
-    method: InterpolationMethod = "nearest"
+    method: InterpolationMethod = "nearest",
+    working_dtype: str = None
 ) -> np.ndarray:
     """
     Perform temporal interpolation on 3D NDSI data.
@@ -43,9 +52,11 @@ def interpolate_temporal(
     
     Parameters
     ----------
-    data : np.ndarray
+    data : np.ndarray or dask.array.Array
         3D array of shape (lat, lon, time) containing NDSI values.
-        NaN values indicate gaps to be filled.
+        NaN values indicate gaps to be filled. A Dask array is processed
+        lazily in spatial tiles that each span the full time axis, and a
+        lazy Dask array is returned.
     nanmask : np.ndarray
         2D boolean array of shape (lat, lon) indicating permanently invalid
         pixels (e.g., outside study area). These pixels remain NaN after
@@ -59,18 +70,28 @@ def interpolate_temporal(
         - "cubic": Catmull-Rom cubic spline interpolation. Smoothest results
           but slightly slower. Falls back to linear at edges.
         Default is "nearest".
+    working_dtype : str, optional
+        Float dtype used for the interpolation: "float32" or "float64".
+        Default is None, which keeps float32/float64 input as-is and uses
+        float32 otherwise. Compact storage dtypes are expanded on entry:
+        float16 is cast, and uint8 (as written by ``save_as_zarr`` with
+        ``output_dtype='uint8'``) is dequantized with its fill value
+        (255) restored to NaN.
         
     Returns
     -------
-    np.ndarray
+    np.ndarray or dask.array.Array
         Interpolated 3D array with the same shape as input. NaN values are
-        filled except where nanmask is True.
+        filled except where nanmask is True. The dtype is
+        ``working_dtype`` if given, otherwise that of ``data`` for
+        float32/float64 input and float32 for anything else.
         
     Raises
     ------
     ValueError
         If method is not one of "nearest", "linear", or "cubic".
         If data and nanmask shapes are incompatible.
+        If working_dtype is not "float32" or "float64".
         
     Examples
     --------
@@ -112,8 +133,21 @@ def interpolate_temporal(
             f"nanmask shape {nanmask.shape}"
         )
     
-    # Ensure correct data types for Numba
-    data_float = data.astype(np.float64) if data.dtype != np.float64 else data.copy()
+    if isinstance(data, da.Array):
+        return _interpolate_temporal_dask(data, nanmask, method, working_dtype)
+    
+    work = _resolve_working_dtype(working_dtype, data.dtype)
+    
+    # Input already in the working dtype goes to the kernels as-is (they
+    # compile a specialization per dtype and never modify their input);
+    # uint8 storage is dequantized in one fused pass, other dtypes are cast
+    if data.dtype == work:
+        data_float = data
+    elif data.dtype == np.uint8:
+        data_float = np.empty(data.shape, dtype=work)
+        dequantize_uint8_3d(data, np.uint8(NDSI_UINT8_FILL_VALUE), data_float)
+    else:
+        data_float = data.astype(work)
     nanmask_bool = nanmask.astype(np.bool_) if nanmask.dtype != np.bool_ else nanmask
     
     # Select and apply interpolation method
@@ -133,6 +167,140 @@ def interpolate_temporal(
         )
 
 
+# Single-day kernels by method name
+_DAY_KERNELS = {
+    "nearest": interpolate_nearest_day,
+    "linear": interpolate_linear_day,
+    "cubic": interpolate_cubic_day,
+}
+
+
+def interpolate_temporal_day(
+    data: np.ndarray,
+    nanmask: np.ndarray,
+    day_index: int,
+    method: InterpolationMethod = "nearest"
+) -> np.ndarray:
+    """
+    Fill the gaps of one day of a 3D window in place.
+    
+    Gives the same values for that day as ``interpolate_temporal``, but
+    only ``data[:, :, day_index]`` is computed and written: the other days
+    are used as observations and left untouched, and no copy of the
+    window is made. Useful when, as in the moving-window pipeline, only
+    one day of each window is kept.
+    
+    Parameters
+    ----------
+    data : np.ndarray
+        3D float32 or float64 array of shape (lat, lon, time), modified
+        in place.
+    nanmask : np.ndarray
+        2D boolean array of shape (lat, lon) indicating permanently invalid
+        pixels, which are left as they are.
+    day_index : int
+        Index of the day to fill along the time axis.
+    method : str, optional
+        "nearest", "linear" or "cubic". Default is "nearest".
+        
+    Returns
+    -------
+    np.ndarray
+        The filled day, a 2D view into ``data``.
+        
+    Raises
+    ------
+    ValueError
+        If method is invalid, data is not a 3D float array, or the shapes
+        of data and nanmask do not match.
+    """
+    kernel = _DAY_KERNELS.get(method.lower())
+    if kernel is None:
+        raise ValueError(
+            f"Invalid interpolation method '{method}'. "
+            f"Must be one of: {get_interpolation_methods()}"
+        )
+    if data.ndim != 3 or data.dtype not in (np.float32, np.float64):
+        raise ValueError(f"data must be a 3D float32/float64 array, got {data.ndim}D {data.dtype}")
+    if data.shape[:2] != nanmask.shape:
+        raise ValueError(
+            f"data spatial dimensions {data.shape[:2]} do not match "
+            f"nanmask shape {nanmask.shape}"
+        )
+    
+    day_index = range(data.shape[2])[day_index]
+    nanmask_bool = nanmask.astype(np.bool_) if nanmask.dtype != np.bool_ else nanmask
+    kernel(data, nanmask_bool, day_index)
+    return data[:, :, day_index]
+
+
+def _resolve_working_dtype(working_dtype, data_dtype):
+    """
+    Resolve the floating-point dtype interpolation computes in.
+    
+    Defaults to ``data_dtype`` when it is float32 or float64, and to
+    float32 otherwise.
+    
+    Raises
+    ------
+    ValueError
+        If working_dtype is not "float32" or "float64".
+    """
+    if working_dtype is None:
+        return data_dtype if data_dtype in (np.float32, np.float64) else np.dtype(np.float32)
+    try:
+        work = np.dtype(working_dtype)
+    except TypeError:
+        work = None
+    if work not in (np.float32, np.float64):
+        raise ValueError(
+            f"working_dtype must be 'float32' or 'float64', got '{working_dtype}'"
+        )
+    return work
+
+
+def _interpolate_temporal_dask(data, nanmask, method, working_dtype):
+    """
+    Lazily interpolate a Dask array tile by tile.
+    
+    Each gap is filled from its own pixel's time series, so the cube is
+    rechunked to a single chunk along time and split spatially into tiles
+    small enough that one tile per Dask worker fits in the available memory.
+    """
+    if not validate_interpolation_method(method):
+        raise ValueError(
+            f"Invalid interpolation method '{method}'. "
+            f"Must be one of: {get_interpolation_methods()}"
+        )
+    
+    # Validated here rather than inside the blocks, where a bad value
+    # would only surface at compute time
+    out_dtype = _resolve_working_dtype(working_dtype, data.dtype)
+    
+    try:
+        import psutil
+        available = psutil.virtual_memory().available
+    except ImportError:
+        available = 2 * 1024 ** 3
+    
+    # Tiles run concurrently, one per worker, and each holds the input
+    # tile, its float copy and the result (with a 1.5x safety margin).
+    # block_size_limit is in bytes of the input dtype
+    n_workers = dask.config.get('num_workers', None) or os.cpu_count() or 1
+    in_size = data.dtype.itemsize
+    bytes_per_element = in_size + 2 * out_dtype.itemsize
+    tile_limit = max(1, int(available / (n_workers * 1.5) * in_size / bytes_per_element))
+    
+    data = data.rechunk({0: 'auto', 1: 'auto', 2: -1}, block_size_limit=tile_limit)
+    mask = da.from_array(np.asarray(nanmask, dtype=np.bool_)[:, :, np.newaxis],
+                         chunks=data.chunks[:2] + ((1,),))
+    
+    return da.map_blocks(
+        lambda block, m: interpolate_temporal(block, m[:, :, 0], method, working_dtype),
+        data, mask, dtype=out_dtype
+    )
+
+
 def get_interpolation_methods() -> list:
     """
     Get list of available interpolation methods.
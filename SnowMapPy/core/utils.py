@@ -9,6 +9,7 @@ Version: 2.0.0
 """
 
 import os
+import math
 import zarr
 import datetime
 import pandas as pd
@@ -28,10 +29,24 @@ MODIS_TERRA_FIRST_AVAILABLE_DATE = "2000-02-24"
 # NOTE: Aqua satellite launched July 4, 2002 - data available after this date
 MODIS_AQUA_FIRST_AVAILABLE_DATE = "2002-07-04"
 
+# Parsed once at import for the date-range checks below
+_MODIS_FIRST_DATE = datetime.date.fromisoformat(MODIS_FIRST_AVAILABLE_DATE)
+_AQUA_FIRST_DATE = datetime.date.fromisoformat(MODIS_AQUA_FIRST_AVAILABLE_DATE)
+
 # These will be set dynamically from GEE, but provide reasonable defaults
 MODIS_DEFAULT_LAST_DATE = None  # Will be queried from GEE
 
 
+def _parse_date(value) -> datetime.date:
+    """Parse a date; 'YYYY-MM-DD' strings skip the slower pandas parser."""
+    if isinstance(value, str):
+        try:
+            return datetime.date.fromisoformat(value)
+        except ValueError:
+            pass
+    return pd.Timestamp(value).date()
+
+
 def check_aqua_availability(start_date: str, end_date: str) -> dict:
     """
     Check if MODIS Aqua data is available for the given date range.
@@ -56,9 +71,9 @@ def check_aqua_availability(start_date: str, end_date: str) -> dict:
             'reason': str or None  # Explanation if not available
         }
     """
-    aqua_first = pd.Timestamp(MODIS_AQUA_FIRST_AVAILABLE_DATE)
-    start_dt = pd.Timestamp(start_date)
-    end_dt = pd.Timestamp(end_date)
+    aqua_first = _AQUA_FIRST_DATE
+    start_dt = _parse_date(start_date)
+    end_dt = _parse_date(end_date)
     
     # Case 1: Entire date range is before Aqua launch
     if end_dt < aqua_first:
@@ -124,8 +139,8 @@ def validate_modis_date_range(
     
     # Parse dates
     try:
-        start_dt = pd.Timestamp(start_date)
-        end_dt = pd.Timestamp(end_date)
+        start_dt = _parse_date(start_date)
+        end_dt = _parse_date(end_date)
     except Exception as e:
         raise ValueError(f"Invalid date format. Use 'YYYY-MM-DD'. Error: {e}")
     
@@ -135,7 +150,7 @@ def validate_modis_date_range(
             f"Start date ({start_date}) cannot be after end date ({end_date})"
         )
     
-    modis_first = pd.Timestamp(MODIS_FIRST_AVAILABLE_DATE)
+    modis_first = _MODIS_FIRST_DATE
     dates_adjusted = False
     
     # Check start date against MODIS availability
@@ -159,7 +174,7 @@ def validate_modis_date_range(
         try:
             latest_date = _get_latest_modis_date(project_name)
             if latest_date:
-                latest_dt = pd.Timestamp(latest_date)
+                latest_dt = _parse_date(latest_date)
                 if end_dt > latest_dt:
                     if verbose:
                         print_warning(
@@ -172,24 +187,23 @@ def validate_modis_date_range(
                             f"  → Adjusting end date to {latest_date}"
                         )
                     end_date = latest_date
+                    end_dt = latest_dt
                     dates_adjusted = True
         except Exception as e:
             # If we can't query GEE, just proceed with user's date
             if verbose:
                 print_warning(f"Could not verify latest MODIS date: {e}")
     
-    # Validate we have a valid range after adjustments
-    final_start = pd.Timestamp(start_date)
-    final_end = pd.Timestamp(end_date)
-    
-    if final_start > final_end:
+    # Validate we have a valid range after adjustments (start_dt/end_dt
+    # track every adjustment, so the strings need not be parsed again)
+    if start_dt > end_dt:
         raise ValueError(
             f"After date adjustments, start date ({start_date}) is after "
             f"end date ({end_date}). Please check your date range."
         )
     
     # Check minimum date range for moving window (need at least 6 days)
-    date_range_days = (final_end - final_start).days
+    date_range_days = (end_dt - start_dt).days
     if date_range_days < 6:
         raise ValueError(
             f"Date range must be at least 6 days for the moving window algorithm. "
@@ -199,10 +213,21 @@ def validate_modis_date_range(
     return start_date, end_date, dates_adjusted
 
 
+# Latest MODIS date per GEE project, queried at most once per process
+_LATEST_MODIS_DATE_CACHE = {}
+
+# Days before today searched first for the latest image
+_LATEST_DATE_LOOKBACK_DAYS = 30
+
+
 def _get_latest_modis_date(project_name: str) -> Optional[str]:
     """
     Query Google Earth Engine for the latest available MODIS snow cover image.
     
+    Only the last few weeks of the collection are searched first; the full
+    collection is scanned only if that window is empty. Successful results
+    are cached for the rest of the process.
+    
     Parameters
     ----------
     project_name : str
@@ -213,6 +238,9 @@ def _get_latest_modis_date(project_name: str) -> Optional[str]:
     str or None
         Latest date in 'YYYY-MM-DD' format, or None if query fails.
     """
+    if project_name in _LATEST_MODIS_DATE_CACHE:
+        return _LATEST_MODIS_DATE_CACHE[project_name]
+    
     try:
         import ee
         
@@ -222,14 +250,22 @@ def _get_latest_modis_date(project_name: str) -> Optional[str]:
         except:
             pass
         
-        # Query Terra collection for latest image
+        # Latest acquisition time in a recent window (a metadata aggregate,
+        # no server-side sort of the 20+ year collection)
         terra = ee.ImageCollection('MODIS/061/MOD10A1')
-        latest_image = terra.sort('system:time_start', False).first()
+        today = datetime.date.today()
+        recent_start = today - datetime.timedelta(days=_LATEST_DATE_LOOKBACK_DAYS)
+        recent = terra.filterDate(recent_start.isoformat(),
+                                  (today + datetime.timedelta(days=1)).isoformat())
+        latest_time = recent.aggregate_max('system:time_start').getInfo()
+        
+        # Processing backlog longer than the window: search everything
+        if latest_time is None:
+            latest_time = terra.aggregate_max('system:time_start').getInfo()
         
-        # Get the date
-        latest_time = latest_image.get('system:time_start').getInfo()
         if latest_time:
             latest_date = pd.Timestamp(latest_time, unit='ms').strftime('%Y-%m-%d')
+            _LATEST_MODIS_DATE_CACHE[project_name] = latest_date
             return latest_date
             
     except Exception:
@@ -294,7 +330,7 @@ def calculate_optimal_chunks(
     Calculate optimal chunk sizes for Dask arrays based on data dimensions.
     
     Optimizes for:
-    - Memory efficiency (chunks fit in L3 cache when possible)
+    - Memory efficiency (each chunk holds about ``target_chunk_mb``)
     - Spatial locality (prioritize keeping spatial dims together)
     - Temporal access patterns (smaller time chunks for streaming)
     
@@ -307,7 +343,8 @@ def calculate_optimal_chunks(
     target_chunk_mb : float
         Target chunk size in megabytes. Default 64MB (good for most systems).
     max_memory_gb : float, optional
-        Maximum available memory. If None, auto-detected.
+        Accepted for backward compatibility; chunk sizes depend only on
+        the shape, dtype and ``target_chunk_mb``.
         
     Returns
     -------
@@ -316,136 +353,127 @@ def calculate_optimal_chunks(
         
     Notes
     -----
-    For MODIS data processing, we prioritize:
-    1. Full spatial extent per chunk when possible (better for spatial ops)
-    2. Smaller time chunks (enables streaming processing)
-    3. Chunk sizes that divide evenly into data dimensions
+    The chunk budget is ``target_elements = target_chunk_mb * 1 MiB / itemsize``.
+    For 3D data the spatial part of a chunk is
+    ``spatial_cap = min(lat * lon, target_elements)`` and the time chunk
+    takes the rest of the budget, ``target_elements // spatial_cap``:
+    
+    1. When a whole raster fits in the budget (always the case for typical
+       MODIS study areas) chunks keep the full spatial extent and only
+       time is chunked.
+    2. Otherwise a single time step is split into square tiles of side
+       ``isqrt(spatial_cap)``, rounded down to a multiple of 32.
     """
-    if max_memory_gb is None:
-        try:
-            import psutil
-            max_memory_gb = psutil.virtual_memory().available / (1024 ** 3)
-        except ImportError:
-            max_memory_gb = 8.0  # Conservative default
-    
-    # Calculate bytes per element
     dtype = np.dtype(dtype)
-    bytes_per_element = dtype.itemsize
-    
-    # Target chunk size in elements
-    target_elements = int((target_chunk_mb * 1024 * 1024) / bytes_per_element)
+    target_elements = max(1, int(target_chunk_mb * 1024 * 1024) // dtype.itemsize)
     
     if len(shape) == 3:
-        lat_size, lon_size, time_size = shape
+        lat_size, lon_size, time_size = (int(s) for s in shape)
         spatial_elements = lat_size * lon_size
+        spatial_cap = max(1, min(spatial_elements, target_elements))
+        time_chunk = max(1, min(time_size, target_elements // spatial_cap))
         
-        # For MODIS-sized data (~500x600 pixels), keep full spatial extent per chunk
-        # This avoids Zarr chunk boundary issues and is more efficient for spatial ops
-        # Only chunk spatially if dimensions are very large (>1500 pixels)
-        max_spatial_for_full_chunk = 1500
-        
-        if lat_size <= max_spatial_for_full_chunk and lon_size <= max_spatial_for_full_chunk:
-            # Use full spatial extent, chunk only time
-            lat_chunk = lat_size
-            lon_chunk = lon_size
-            time_chunk = max(1, min(time_size, target_elements // spatial_elements))
-            # Round time to nice numbers that divide evenly or leave small remainder
-            time_chunk = _round_to_zarr_compatible_chunk(time_chunk, time_size)
-        elif spatial_elements <= target_elements:
-            # Small spatial extent: use full spatial, chunk time
-            lat_chunk = lat_size
-            lon_chunk = lon_size
-            time_chunk = max(1, min(time_size, target_elements // spatial_elements))
-            time_chunk = _round_to_zarr_compatible_chunk(time_chunk, time_size)
-        else:
-            # Very large spatial extent: balance spatial and temporal
-            # Aim for ~50 time steps per chunk for good streaming
-            time_chunk = _round_to_zarr_compatible_chunk(min(50, time_size), time_size)
-            remaining_elements = target_elements // time_chunk
-            
-            # Calculate spatial chunks that maintain aspect ratio
-            aspect_ratio = lat_size / lon_size if lon_size > 0 else 1
-            lon_chunk = int(np.sqrt(remaining_elements / aspect_ratio))
-            lat_chunk = int(lon_chunk * aspect_ratio)
-            
-            # Ensure minimum chunk sizes and Zarr compatibility
-            lat_chunk = _round_to_zarr_compatible_chunk(max(64, min(lat_size, lat_chunk)), lat_size)
-            lon_chunk = _round_to_zarr_compatible_chunk(max(64, min(lon_size, lon_chunk)), lon_size)
+        if spatial_elements <= target_elements:
+            return (lat_size, lon_size, time_chunk)
         
+        lat_chunk, lon_chunk = _square_spatial_chunks(lat_size, lon_size, spatial_cap)
         return (lat_chunk, lon_chunk, time_chunk)
     
     elif len(shape) == 2:
-        lat_size, lon_size = shape
+        lat_size, lon_size = (int(s) for s in shape)
         # For 2D data (DEM), use larger spatial chunks
-        chunk_size = int(np.sqrt(target_elements))
-        lat_chunk = _round_to_zarr_compatible_chunk(min(lat_size, chunk_size), lat_size)
-        lon_chunk = _round_to_zarr_compatible_chunk(min(lon_size, chunk_size), lon_size)
-        return (lat_chunk, lon_chunk)
+        return _square_spatial_chunks(lat_size, lon_size, target_elements)
     
     else:
         # Fallback for other dimensions
         return tuple(min(s, 128) for s in shape)
 
 
-def _round_to_zarr_compatible_chunk(chunk: int, dim_size: int) -> int:
+def _square_spatial_chunks(lat_size: int, lon_size: int, budget: int) -> Tuple[int, int]:
     """
-    Round chunk size to ensure Zarr compatibility.
+    Split a ``budget`` of elements into square (lat, lon) chunks.
+    
+    The side is ``isqrt(budget)`` rounded down to a multiple of 32. When
+    one dimension is smaller than the side, the remaining budget goes to
+    the other dimension.
+    """
+    side = math.isqrt(budget)
+    if side >= 32:
+        side -= side % 32
+    
+    lat_chunk = min(lat_size, side)
+    lon_chunk = min(lon_size, side)
     
-    Zarr requires the final chunk to be <= the first chunk.
-    This function ensures valid chunking by using the full dimension
-    or a chunk size that results in a smaller (or equal) final chunk.
+    # Redistribute the budget when one side is clamped by the data extent
+    if lat_chunk < side:
+        lon_chunk = min(lon_size, max(1, budget // lat_chunk))
+    elif lon_chunk < side:
+        lat_chunk = min(lat_size, max(1, budget // lon_chunk))
     
+    return (lat_chunk, lon_chunk)
+
+
+def compute_balanced_chunks(
+    n_lat: int,
+    n_lon: int,
+    n_time: int,
+    itemsize: int,
+    target_bytes: int = 4_000_000,
+    time_chunk: Optional[int] = None
+) -> Tuple[int, int, int]:
+    """
+    Calculate (lat, lon, time) chunk sizes for Zarr storage.
+
+    Unlike full-spatial chunks (one whole raster per time step), balanced
+    chunks keep both access patterns cheap: reading a map decodes a few
+    tiles per time step, and reading the time series of one pixel decodes
+    one small tile per time chunk instead of whole rasters.
+
     Parameters
     ----------
-    chunk : int
-        Target chunk size.
-    dim_size : int
-        Total size of the dimension.
-        
+    n_lat : int
+        Number of latitude pixels.
+    n_lon : int
+        Number of longitude pixels.
+    n_time : int
+        Number of timesteps (1 for 2D data such as a DEM).
+    itemsize : int
+        Bytes per element (e.g. ``ds[var].dtype.itemsize``).
+    target_bytes : int
+        Target uncompressed chunk size in bytes. Default ~4 MB.
+    time_chunk : int, optional
+        Time chunk to use instead of ``min(n_time, 64)``, e.g. the time
+        chunk of the Dask source so that each output chunk is read from
+        a single source chunk along time.
+
     Returns
     -------
-    int
-        Zarr-compatible chunk size.
+    tuple
+        Chunk sizes (lat, lon, time), each clamped to its dimension.
+
+    Notes
+    -----
+    The time chunk defaults to ``min(n_time, 64)``; the spatial chunks are square
+    with side ``isqrt(target_bytes // (itemsize * time_chunk))``. When one
+    spatial dimension is smaller than that side, the remaining budget is
+    given to the other dimension.
     """
-    if chunk >= dim_size:
-        return dim_size
-    
-    # Nice chunk sizes (prefer these for memory alignment)
-    nice_sizes = [32, 64, 128, 256, 512, 1024]
-    
-    # Find closest nice size that is Zarr-compatible
-    for nice in nice_sizes:
-        if nice >= chunk * 0.7 and nice <= chunk * 1.3:
-            if nice <= dim_size:
-                remainder = dim_size % nice
-                # Check Zarr requirement: last chunk <= first chunk
-                if remainder == 0 or remainder <= nice:
-                    return nice
-    
-    # If no nice size fits, calculate a compatible chunk size
-    # Round to nearest 32 first
-    rounded = max(32, (chunk // 32) * 32)
-    if rounded > dim_size:
-        return dim_size
-    
-    # Verify Zarr compatibility
-    remainder = dim_size % rounded
-    if remainder == 0 or remainder <= rounded:
-        return rounded
-    
-    # If still incompatible, try finding a divisor or use full dimension
-    # For moderate-sized dimensions, just use the full size (simpler and safer)
-    if dim_size <= 2000:
-        return dim_size
-    
-    # For large dimensions, find a working chunk size
-    # by incrementally reducing until we get a valid configuration
-    for test_chunk in range(rounded, 31, -1):
-        remainder = dim_size % test_chunk
-        if remainder == 0 or remainder <= test_chunk:
-            return test_chunk
-    
-    return dim_size  # Ultimate fallback
+    if time_chunk is None:
+        time_chunk = 64
+    time_chunk = max(1, min(n_time, time_chunk))
+    spatial_elements = max(1, target_bytes // (itemsize * time_chunk))
+    side = max(1, math.isqrt(spatial_elements))
+
+    lat_chunk = min(n_lat, side)
+    lon_chunk = min(n_lon, side)
+
+    # Redistribute the budget when one side is clamped by the data extent
+    if lat_chunk < side:
+        lon_chunk = min(n_lon, max(1, spatial_elements // lat_chunk))
+    elif lon_chunk < side:
+        lat_chunk = min(n_lat, max(1, spatial_elements // lon_chunk))
+
+    return (lat_chunk, lon_chunk, time_chunk)
 
 
 def estimate_memory_for_processing(
@@ -482,11 +510,11 @@ def estimate_memory_for_processing(
     spatial_pixels = n_lat * n_lon
     total_pixels = spatial_pixels * n_time
     
-    # Moving window: 6 days × 4 arrays (terra/aqua value/class) × spatial × float64
-    window_bytes = 6 * 4 * spatial_pixels * 8
+    # Moving window: 6 days × 4 arrays (terra/aqua value/class) × spatial × float32
+    window_bytes = 6 * 4 * spatial_pixels * 4
     
-    # DEM: spatial × float64
-    dem_bytes = spatial_pixels * 8
+    # DEM: spatial × float32
+    dem_bytes = spatial_pixels * 4
     
     # Output array (if kept in memory): full size
     output_bytes = total_pixels * bytes_per
@@ -520,7 +548,11 @@ def estimate_memory_for_processing(
 
 def extract_date(filename):
     """Extract date from MODIS filename."""
-    date_str = filename.split('_')[-1].split('.')[0]
+    date_str = filename.rpartition('_')[2].partition('.')[0]
+    # fromisoformat is implemented in C but accepts more than YYYY-MM-DD,
+    # so only padded dates take it; strptime handles (and validates) the rest
+    if len(date_str) == 10 and date_str[4] == date_str[7] == '-':
+        return datetime.datetime.fromisoformat(date_str)
     return datetime.datetime.strptime(date_str, '%Y-%m-%d')
 
 
@@ -536,10 +568,11 @@ def generate_file_lists(dir_MOD, dir_MYD):
 
 def get_map_dimensions(dir_MOD, dir_MYD, MODfiles, MYDfiles):
     """Get and validate map dimensions from MODIS files."""
-    row_mod, col_mod = zarr.open(os.path.join(dir_MOD, MODfiles[0]), mode='r')['SCA'][:].shape
-    row_myd, col_myd = zarr.open(os.path.join(dir_MYD, MYDfiles[0]), mode='r')['SCA'][:].shape
+    # Shapes come from the array metadata; no chunk is read or decompressed
+    row_mod, col_mod = zarr.open(os.path.join(dir_MOD, MODfiles[0]), mode='r')['SCA'].shape
+    row_myd, col_myd = zarr.open(os.path.join(dir_MYD, MYDfiles[0]), mode='r')['SCA'].shape
 
-    if row_mod != row_myd or col_myd != col_myd:
+    if row_mod != row_myd or col_mod != col_myd:
         raise ValueError('MODIS files do not have the same dimensions')
     
     return row_mod, col_mod, row_myd, col_myd